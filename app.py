@@ -3,11 +3,16 @@
 
 from flask import Flask, render_template, request, jsonify, send_file
 from flask_cors import CORS
+import io
 import os
 from config import DEBUG, HOST, PORT, MAX_CONTENT_LENGTH, OUTPUT_FOLDER, CORS_ORIGINS
 from presentation_service import presentation_service
 from user_manager import user_manager
 from job_store import get_job
+from llm_client import get_llm_stats
+from prompt_cache import prompt_cache
+from chart_cache import chart_image_cache
+from presentation_pool import presentation_pool
 import time
 
 app = Flask(__name__)
@@ -19,6 +24,9 @@ CORS(app, origins=CORS_ORIGINS)
 # Ensure output folder exists
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
+# Parse the base presentation template once per worker, before the first request
+presentation_pool.warm()
+
 @app.route('/')
 def index():
     """Serve the main website"""
@@ -33,6 +41,16 @@ def health_check():
         'message': 'DeckMaster is running perfectly'
     })
 
+@app.route('/api/llm/stats')
+def llm_stats():
+    """LLM backend, request queue and prompt cache metrics"""
+    return jsonify({'success': True, 'llm': get_llm_stats(), 'prompt_cache': prompt_cache.get_stats()})
+
+@app.route('/api/charts/stats')
+def chart_stats():
+    """Rendered chart/table image cache metrics"""
+    return jsonify({'success': True, 'chart_cache': chart_image_cache.get_stats()})
+
 @app.route('/api/admin/activate', methods=['POST'])
 def activate_admin():
     """Activate admin mode"""
@@ -94,6 +112,67 @@ def get_job_status(job_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/job/<job_id>/slides/<int:slide_number>/regenerate', methods=['POST'])
+def regenerate_slide(job_id, slide_number):
+    """Regenerate one slide of a finished deck with the LLM"""
+    try:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'error': 'Request body must be a JSON object'}), 400
+        result = presentation_service.regenerate_slide(job_id, slide_number, data.get('instructions'))
+        if result['success']:
+            return jsonify(result)
+        else:
+            return jsonify(result), 400
+    except Exception as e:
+        print(f"[API ERROR] Slide regeneration failed: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/job/<job_id>/slides/<int:slide_number>', methods=['PUT'])
+def edit_slide(job_id, slide_number):
+    """Replace one slide of a finished deck with the posted title and bullets"""
+    try:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'error': 'Request body must be a JSON object'}), 400
+        result = presentation_service.edit_slide(job_id, slide_number, data)
+        if result['success']:
+            return jsonify(result)
+        else:
+            return jsonify(result), 400
+    except Exception as e:
+        print(f"[API ERROR] Slide edit failed: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/job/<job_id>/restyle', methods=['POST'])
+def restyle_presentation(job_id):
+    """Re-render a finished deck in one or more other design styles"""
+    try:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'error': 'Request body must be a JSON object'}), 400
+        design_styles = data.get('design_styles') or data.get('design_style')
+        result = presentation_service.restyle(job_id, design_styles, data.get('visual_preferences'))
+        if result['success']:
+            return jsonify(result)
+        else:
+            return jsonify(result), 400
+    except Exception as e:
+        print(f"[API ERROR] Restyle failed: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/job/<job_id>/preview/<int:slide_number>.png')
+def slide_preview(job_id, slide_number):
+    """Low-res PNG preview of one slide (optional ?width= in pixels)"""
+    try:
+        result = presentation_service.get_slide_preview(job_id, slide_number, request.args.get('width', type=int))
+        if not result['success']:
+            return jsonify(result), 404
+        return send_file(io.BytesIO(result['png']), mimetype='image/png', max_age=300)
+    except Exception as e:
+        print(f"[API ERROR] Preview failed: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/download/<job_id>')
 def download_presentation(job_id):
     """PERFECT download - always works"""
@@ -190,8 +269,14 @@ if __name__ == '__main__':
     print("  GET  /                     - Main website")
     print("  POST /api/generate         - Generate PPT")
     print("  GET  /api/job/<id>         - Job status")
+    print("  POST /api/job/<id>/slides/<n>/regenerate - Regenerate one slide")
+    print("  PUT  /api/job/<id>/slides/<n>            - Edit one slide")
+    print("  POST /api/job/<id>/restyle               - Re-render in other designs")
+    print("  GET  /api/job/<id>/preview/<n>.png       - Slide preview")
     print("  GET  /api/download/<id>    - Download PPT")
     print("  GET  /api/file-info/<id>   - File information")
+    print("  GET  /api/llm/stats        - LLM queue metrics")
+    print("  GET  /api/charts/stats     - Chart image cache metrics")
     print("=" * 60)
     print(f"🌐 Server: http://{HOST}:{PORT}")
     print("🔧 Admin password: DeckMaster2024!@#SecureAdmin")
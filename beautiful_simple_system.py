@@ -1,10 +1,11 @@
 # beautiful_simple_system.py
 # Simple, Beautiful Presentation System - Focus on Looking Good
 
-from pptx.util import Inches, Pt
+from pptx.util import Emu, Inches, Pt
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
 from pptx.enum.shapes import MSO_SHAPE
 from pptx.dml.color import RGBColor
+from config import CHART_ENGINE, TABLE_ENGINE
 import io
 
 class BeautifulSimpleSystem:
@@ -17,6 +18,14 @@ class BeautifulSimpleSystem:
         self.beautiful_margin = Inches(1.5)  # Very generous margins
         self.content_width = self.slide_width - (self.beautiful_margin * 2)
         self.content_height = self.slide_height - (self.beautiful_margin * 2)
+        
+        # Right-hand visual box (images, charts, tables) - raster visuals are sized to it
+        self.visual_width = self.slide_width * 0.35
+        self.visual_height = self.slide_height * 0.5
+    
+    def visual_box_inches(self):
+        """(width, height) of the visual box in inches"""
+        return (Emu(self.visual_width).inches, Emu(self.visual_height).inches)
     
     def create_beautiful_slide(self, slide, slide_data, slide_index, total_slides, design_style='minimal_1'):
         """Create simple, beautiful slide that actually looks good"""
@@ -210,8 +219,13 @@ class BeautifulSimpleSystem:
             except:
                 pass
 
-    def add_single_beautiful_visual(self, slide, slide_data, design_style, layout_info, visual_type, slide_index=0, total_slides=10):
-        """Add ONE beautiful visual element with professional distribution"""
+    def add_single_beautiful_visual(self, slide, slide_data, design_style, layout_info, visual_type, slide_index=0, total_slides=10,
+                                    prerendered=None):
+        """Add ONE beautiful visual element with professional distribution
+
+        prerendered is the slide's visual from the deck prepass ({'visual_type', 'data', 'image'}),
+        used instead of generating and rendering it here when its type matches.
+        """
         
         try:
             # Professional visual distribution pattern
@@ -234,24 +248,27 @@ class BeautifulSimpleSystem:
                 else:
                     visual_type = 'image'
             
+            if prerendered is not None and prerendered['visual_type'] != visual_type:
+                prerendered = None
+            
             # Add the visual element
             if visual_type == 'image':
-                success = self._add_beautiful_image(slide, slide_data, design_style)
+                success = self._add_beautiful_image(slide, slide_data, design_style, prerendered)
                 if success:
                     print(f"[BEAUTIFUL] ✓ Added beautiful image to slide {slide_index + 1}")
                 return success
             elif visual_type == 'chart':
-                success = self._add_beautiful_chart(slide, slide_data, design_style, 'bar')
+                success = self._add_beautiful_chart(slide, slide_data, design_style, 'bar', prerendered)
                 if success:
                     print(f"[BEAUTIFUL] ✓ Added beautiful bar chart to slide {slide_index + 1}")
                 return success
             elif visual_type == 'pie':
-                success = self._add_beautiful_chart(slide, slide_data, design_style, 'pie')
+                success = self._add_beautiful_chart(slide, slide_data, design_style, 'pie', prerendered)
                 if success:
                     print(f"[BEAUTIFUL] ✓ Added beautiful pie chart to slide {slide_index + 1}")
                 return success
             elif visual_type == 'table':
-                success = self._add_beautiful_table(slide, slide_data, design_style)
+                success = self._add_beautiful_table(slide, slide_data, design_style, prerendered)
                 if success:
                     print(f"[BEAUTIFUL] ✓ Added beautiful table to slide {slide_index + 1}")
                 return success
@@ -292,29 +309,31 @@ class BeautifulSimpleSystem:
             cycle = ['image', 'chart', 'table', 'pie']
             return cycle[(slide_index - 1) % 4]
     
-    def _add_beautiful_image(self, slide, slide_data, design_style):
-        """Add beautiful image from API"""
+    def _add_beautiful_image(self, slide, slide_data, design_style, prerendered=None):
+        """Add beautiful image from API (or the one the deck prefetch already downloaded)"""
         try:
-            from image_api_service import image_api
+            from image_api_service import image_api, PendingImage
             
-            # Get image from API
-            image_data = image_api.get_image_for_slide(slide_data)
+            if prerendered is not None:
+                # A prefetched image is waited for here, by the slide that shows it
+                image_bytes = prerendered['image']
+                if isinstance(image_bytes, PendingImage):
+                    image_bytes = image_bytes.result()
+            else:
+                # Get image from API and download it
+                image_bytes = image_api.fetch_for_slide(slide_data, box=self.visual_box_inches())
             
-            if image_data and 'url' in image_data:
-                # Download image
-                image_bytes = image_api.download_image(image_data['url'])
+            if image_bytes:
+                # Beautiful positioning - right side with generous margins
+                img_left = self.slide_width * 0.6  # More space for text
+                img_top = self.beautiful_margin + Inches(1.5)  # Below title
+                img_width = self.visual_width  # Reasonable size
+                img_height = self.visual_height  # Not too tall
                 
-                if image_bytes:
-                    # Beautiful positioning - right side with generous margins
-                    img_left = self.slide_width * 0.6  # More space for text
-                    img_top = self.beautiful_margin + Inches(1.5)  # Below title
-                    img_width = self.slide_width * 0.35  # Reasonable size
-                    img_height = self.slide_height * 0.5  # Not too tall
-                    
-                    # Add image
-                    image_stream = io.BytesIO(image_bytes)
-                    slide.shapes.add_picture(image_stream, img_left, img_top, img_width, img_height)
-                    return True
+                # Add image
+                image_stream = io.BytesIO(image_bytes)
+                slide.shapes.add_picture(image_stream, img_left, img_top, img_width, img_height)
+                return True
             
             # Fallback to placeholder
             return self._add_beautiful_placeholder(slide, slide_data, design_style)
@@ -323,27 +342,45 @@ class BeautifulSimpleSystem:
             print(f"[BEAUTIFUL_IMAGE] Error: {e}")
             return self._add_beautiful_placeholder(slide, slide_data, design_style)
     
-    def _add_beautiful_chart(self, slide, slide_data, design_style, chart_type='bar'):
+    def build_visual_data(self, slide_data, visual_type, design_style=None):
+        """Chart data ('chart', 'pie') or TableData ('table') for a slide's visual - deterministic per slide and style"""
+        from chart_service import chart_service
+        
+        if visual_type == 'table':
+            return chart_service.create_table_data(slide_data, design_style)
+        
+        # Determine chart type based on content or parameter
+        title = slide_data.get('title', '').lower()
+        if visual_type == 'pie' or 'distribution' in title or 'segment' in title or 'mix' in title:
+            return chart_service.generate_chart_data(slide_data, 'pie', design_style)
+        return chart_service.generate_chart_data(slide_data, 'bar', design_style)
+    
+    def _add_beautiful_chart(self, slide, slide_data, design_style, chart_type='bar', prerendered=None):
         """Add beautiful chart"""
         try:
             from chart_service import chart_service
             
-            # Determine chart type based on content or parameter
-            title = slide_data.get('title', '').lower()
-            if chart_type == 'pie' or 'distribution' in title or 'segment' in title or 'mix' in title:
-                chart_data = chart_service.generate_chart_data(slide_data, 'pie')
-                chart_image_bytes = chart_service.create_chart_image(chart_data, 'modern')
+            if prerendered is not None:
+                chart_data = prerendered['data']
             else:
-                chart_data = chart_service.generate_chart_data(slide_data, 'bar')
-                chart_image_bytes = chart_service.create_chart_image(chart_data, 'modern')
+                chart_data = self.build_visual_data(slide_data, 'pie' if chart_type == 'pie' else 'chart', design_style)
+            
+            # Beautiful positioning - right side
+            chart_left = self.slide_width * 0.6
+            chart_top = self.beautiful_margin + Inches(1.5)
+            chart_width = self.visual_width
+            chart_height = self.visual_height
             
+            if CHART_ENGINE == 'native':
+                # Editable PowerPoint chart - no rasterizing
+                chart_service.add_native_chart(slide, chart_data, chart_left, chart_top, chart_width, chart_height, design_style)
+                return True
+            
+            if prerendered is not None and prerendered.get('image'):
+                chart_image_bytes = prerendered['image']
+            else:
+                chart_image_bytes = chart_service.create_chart_image(chart_data, 'modern')
             if chart_image_bytes:
-                # Beautiful positioning - right side
-                chart_left = self.slide_width * 0.6
-                chart_top = self.beautiful_margin + Inches(1.5)
-                chart_width = self.slide_width * 0.35
-                chart_height = self.slide_height * 0.5
-                
                 # Add chart
                 image_stream = io.BytesIO(chart_image_bytes)
                 slide.shapes.add_picture(image_stream, chart_left, chart_top, chart_width, chart_height)
@@ -355,22 +392,34 @@ class BeautifulSimpleSystem:
             print(f"[BEAUTIFUL_CHART] Error: {e}")
             return False
     
-    def _add_beautiful_table(self, slide, slide_data, design_style):
+    def _add_beautiful_table(self, slide, slide_data, design_style, prerendered=None):
         """Add beautiful table positioned on the right side to avoid text overlap"""
         try:
             from chart_service import chart_service
             
             # Generate table
-            df = chart_service.create_table_data(slide_data)
-            table_image_bytes = chart_service.create_table_image(df, 'modern')
+            if prerendered is not None:
+                table_data = prerendered['data']
+            else:
+                table_data = self.build_visual_data(slide_data, 'table', design_style)
+            
+            # FIXED: Position table on RIGHT SIDE to avoid text overlap
+            table_left = self.slide_width * 0.6  # Right side like images/charts
+            table_top = self.beautiful_margin + Inches(1.5)  # Below title
+            table_width = self.visual_width  # Same width as other visuals
+            table_height = self.visual_height  # Reasonable height
+            
+            if TABLE_ENGINE == 'native':
+                # PowerPoint table - a few KB of XML instead of a 200 dpi PNG
+                chart_service.add_native_table(slide, table_data, table_left, table_top, table_width, table_height, design_style)
+                return True
+            
+            if prerendered is not None and prerendered.get('image'):
+                table_image_bytes = prerendered['image']
+            else:
+                table_image_bytes = chart_service.create_table_image(table_data, 'modern')
             
             if table_image_bytes:
-                # FIXED: Position table on RIGHT SIDE to avoid text overlap
-                table_left = self.slide_width * 0.6  # Right side like images/charts
-                table_top = self.beautiful_margin + Inches(1.5)  # Below title
-                table_width = self.slide_width * 0.35  # Same width as other visuals
-                table_height = self.slide_height * 0.5  # Reasonable height
-                
                 print(f"[BEAUTIFUL_TABLE] Positioning table on RIGHT SIDE to avoid text overlap")
                 print(f"[BEAUTIFUL_TABLE] Position: left={table_left}, top={table_top}")
                 
@@ -391,7 +440,7 @@ class BeautifulSimpleSystem:
             # Beautiful placeholder - right side
             placeholder_left = self.slide_width * 0.6
             placeholder_top = self.beautiful_margin + Inches(1.5)
-            placeholder_width = self.slide_width * 0.35
+            placeholder_width = self.visual_width
             placeholder_height = self.slide_height * 0.4
             
             # Create beautiful rounded rectangle
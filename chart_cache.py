@@ -0,0 +1,160 @@
+# chart_cache.py
+# Content-keyed cache for rendered chart and table images - in-memory LRU plus an optional disk tier
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from config import CHART_CACHE_MAX_BYTES, CHART_CACHE_DIR, CHART_CACHE_DISK_MAX_BYTES
+
+
+class ChartImageCache:
+    """
+    PNG bytes of rendered visuals, keyed by what was rendered
+
+    The key is a SHA1 of the visual's data, style, size and dpi, so identical
+    charts from different decks share one entry. Both tiers are bounded by
+    bytes and evict least recently used entries first. The disk tier
+    (CHART_CACHE_DIR, off when empty) survives restarts and can be shared by
+    the render processes on a host; disk hits are promoted to memory. Each
+    process tracks the disk budget for the files it knows about, so the disk
+    bound is approximate when several processes write.
+    """
+
+    def __init__(self, max_bytes: int = CHART_CACHE_MAX_BYTES, directory: Optional[str] = CHART_CACHE_DIR,
+                 disk_max_bytes: int = CHART_CACHE_DISK_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.directory = directory or None
+        self.disk_max_bytes = disk_max_bytes
+
+        self._entries = OrderedDict()  # key -> PNG bytes, oldest first
+        self._bytes = 0
+        self._disk_entries = OrderedDict()  # key -> file size, oldest first
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "disk_evictions": 0}
+
+        if self.directory:
+            self._load_disk_index()
+
+    def make_key(self, kind: str, data, style: str, size, dpi: int) -> str:
+        """Key for a visual of kind ('chart', 'table') rendered from data"""
+        payload = json.dumps([kind, data, style, list(size), dpi], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return png
+
+        png = self._read_disk(key)
+        with self._lock:
+            if png is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            self._put_memory(key, png)
+        return png
+
+    def put(self, key: str, png: bytes):
+        with self._lock:
+            self._put_memory(key, png)
+            self.stats["stores"] += 1
+        self._write_disk(key, png)
+
+    def _put_memory(self, key: str, png: bytes):
+        """Add png to the memory tier (caller holds the lock)"""
+        if len(png) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = png
+        self._bytes += len(png)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.stats["evictions"] += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.png")
+
+    def _load_disk_index(self):
+        """Index the files already in the cache directory, oldest access first"""
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".png"):
+                    try:
+                        stat = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(files):
+            self._disk_entries[key] = size
+            self._disk_bytes += size
+        print(f"[CHART_CACHE] Disk tier at {self.directory}: {len(files)} images, {self._disk_bytes / 1024 / 1024:.1f} MB")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                png = f.read()
+            os.utime(path)  # mtime is the access time for LRU order after a restart
+        except OSError:
+            return None
+        with self._lock:
+            if key in self._disk_entries:
+                self._disk_entries.move_to_end(key)
+        return png
+
+    def _write_disk(self, key: str, png: bytes):
+        if not self.directory or len(png) > self.disk_max_bytes:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename, so other processes never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(png)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[CHART_CACHE] Disk write failed: {e}")
+            return
+
+        with self._lock:
+            self._disk_bytes -= self._disk_entries.pop(key, 0)
+            self._disk_entries[key] = len(png)
+            self._disk_bytes += len(png)
+            evicted = []
+            while self._disk_bytes > self.disk_max_bytes:
+                old_key, old_size = self._disk_entries.popitem(last=False)
+                self._disk_bytes -= old_size
+                evicted.append(old_key)
+                self.stats["disk_evictions"] += 1
+
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            return dict(self.stats, entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes,
+                        disk_entries=len(self._disk_entries), disk_bytes=self._disk_bytes,
+                        hit_rate=(self.stats["hits"] + self.stats["disk_hits"]) / lookups if lookups else 0.0)
+
+
+# Global instance
+chart_image_cache = ChartImageCache()
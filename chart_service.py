@@ -1,45 +1,145 @@
 # chart_service.py
-# Chart and Table Generation Service using Matplotlib and Pandas
+# Chart and Table Generation Service using Matplotlib and native PowerPoint charts/tables
 
-import matplotlib.pyplot as plt
+import matplotlib
 import matplotlib.patches as patches
-import pandas as pd
 import numpy as np
 import io
 import base64
+import hashlib
+import json
+import textwrap
+import threading
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+from matplotlib.textpath import text_to_path
 from PIL import Image
 import seaborn as sns
+from beautiful_simple_system import beautiful_system
+from chart_cache import chart_image_cache
+from config import CHART_FIGURE_POOL_SIZE, VISUAL_TARGET_DPI, RASTER_PNG_COLORS
+
+# Figures keep an 8 in design width (font sizes look as they always have) in the aspect of the
+# slide's visual box, and are drawn at the dpi that gives VISUAL_TARGET_DPI once placed in the box
+VISUAL_BOX_INCHES = beautiful_system.visual_box_inches()
+CHART_IMAGE_SIZE = (8, round(8 * VISUAL_BOX_INCHES[1] / VISUAL_BOX_INCHES[0], 2))
+TABLE_IMAGE_SIZE = CHART_IMAGE_SIZE
+
+# Fixed axes placement (figure fractions) - replaces tight_layout and bbox_inches='tight',
+# which each cost an extra draw of the whole figure
+CHART_LAYOUT = {'left': 0.1, 'right': 0.96, 'bottom': 0.1, 'top': 0.86}
+PIE_LAYOUT = {'left': 0.04, 'right': 0.96, 'bottom': 0.04, 'top': 0.86}
+PIE_LEGEND_LAYOUT = {'left': 0.02, 'right': 0.6, 'bottom': 0.04, 'top': 0.86}
+
+# Pie labels wider than this (inches) would run off the figure beside the
+# wedges, so the pie gets a legend instead; legend entries wrap at PIE_LEGEND_WRAP
+PIE_INLINE_LABEL_INCHES = 1.2
+PIE_LEGEND_WRAP = 22
+TABLE_LAYOUT = {'left': 0.02, 'right': 0.98, 'bottom': 0.02, 'top': 0.98}
+TABLE_TITLE_LAYOUT = {'left': 0.02, 'right': 0.98, 'bottom': 0.02, 'top': 0.88}
+
+class TableData:
+    """
+    A table visual: column headers plus rows of display strings
+
+    title is the slide title the table was built for (None for a generic table).
+    """
+
+    __slots__ = ("columns", "rows", "title")
+
+    def __init__(self, columns, rows, title=None):
+        self.columns = list(columns)
+        self.rows = [list(row) for row in rows]
+        self.title = title
+
+    @classmethod
+    def from_columns(cls, data, title=None):
+        """Build from {header: [cell, ...]} in column order"""
+        return cls(data.keys(), zip(*data.values()), title)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return f"TableData(columns={self.columns!r}, rows={self.rows!r}, title={self.title!r})"
+
+
+class FigurePool:
+    """
+    Reusable Agg figures, kept per figure size
+
+    Figures are built with the object-oriented API on their own Agg canvas, so
+    rendering never goes through pyplot's global figure manager or depends on
+    the configured backend. A released figure is cleared and kept for the next
+    render of the same size (up to max_per_size each).
+    """
+
+    def __init__(self, max_per_size: int = CHART_FIGURE_POOL_SIZE):
+        self.max_per_size = max_per_size
+        self._figures = {}  # (width, height) -> [Figure, ...]
+        self._lock = threading.Lock()
+        self.stats = {"created": 0, "reused": 0}
+
+    def acquire(self, size):
+        key = tuple(size)
+        with self._lock:
+            figures = self._figures.get(key)
+            if figures:
+                self.stats["reused"] += 1
+                return figures.pop()
+            self.stats["created"] += 1
+
+        fig = Figure(figsize=key)
+        FigureCanvasAgg(fig)
+        return fig
+
+    def release(self, fig):
+        fig.clear()
+        key = tuple(fig.get_size_inches())
+        with self._lock:
+            figures = self._figures.setdefault(key, [])
+            if len(figures) < self.max_per_size:
+                figures.append(fig)
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, pooled=sum(len(figures) for figures in self._figures.values()))
+
 
 class ChartService:
     def __init__(self):
         # Set style
-        plt.style.use('default')
+        matplotlib.style.use('default')
         sns.set_palette("husl")
+        self.image_cache = chart_image_cache
+        self.figure_pool = FigurePool()
         
-    def generate_chart_data(self, slide_content, chart_type='bar'):
-        """Generate chart data based on slide content"""
+    def generate_chart_data(self, slide_content, chart_type='bar', design_style=None):
+        """Generate chart data based on slide content (the same slide and style always give the same data)"""
         try:
             # Extract meaningful data from slide content
             title = slide_content.get('title', 'Chart')
             bullets = slide_content.get('bullets', [])
+            rng = _content_rng(chart_type, title, bullets, design_style)
             
             # Generate data based on content
             if chart_type == 'bar':
-                return self._generate_bar_data(title, bullets)
+                return self._generate_bar_data(title, bullets, rng)
             elif chart_type == 'line':
                 return self._generate_line_data(title, bullets)
             elif chart_type == 'pie':
-                return self._generate_pie_data(title, bullets)
+                return self._generate_pie_data(title, bullets, rng)
             elif chart_type == 'scatter':
-                return self._generate_scatter_data(title, bullets)
+                return self._generate_scatter_data(title, bullets, rng)
             else:
-                return self._generate_bar_data(title, bullets)
+                return self._generate_bar_data(title, bullets, rng)
                 
         except Exception as e:
             print(f"[CHART_DATA] Error: {e}")
             return self._get_default_data(chart_type)
     
-    def _generate_bar_data(self, title, bullets):
+    def _generate_bar_data(self, title, bullets, rng):
         """Generate bar chart data"""
         categories = []
         values = []
@@ -51,7 +151,7 @@ class ChartService:
             category = ' '.join(words[:2])  # First 2 words as category
             
             # Generate realistic values
-            value = np.random.randint(20, 100)
+            value = int(rng.integers(20, 100))
             
             categories.append(category if category else f"Category {len(categories)+1}")
             values.append(value)
@@ -59,7 +159,7 @@ class ChartService:
         # Ensure we have at least 3 categories
         while len(categories) < 3:
             categories.append(f"Item {len(categories)+1}")
-            values.append(np.random.randint(30, 90))
+            values.append(int(rng.integers(30, 90)))
         
         return {
             'type': 'bar',
@@ -81,7 +181,7 @@ class ChartService:
             'title': title
         }
     
-    def _generate_pie_data(self, title, bullets):
+    def _generate_pie_data(self, title, bullets, rng):
         """Generate pie chart data"""
         labels = []
         sizes = []
@@ -90,7 +190,7 @@ class ChartService:
         for bullet in bullets[:5]:  # Max 5 slices
             words = bullet.split()
             label = ' '.join(words[:2])
-            size = np.random.randint(10, 40)
+            size = int(rng.integers(10, 40))
             
             labels.append(label if label else f"Segment {len(labels)+1}")
             sizes.append(size)
@@ -98,7 +198,7 @@ class ChartService:
         # Ensure we have at least 3 segments
         while len(labels) < 3:
             labels.append(f"Part {len(labels)+1}")
-            sizes.append(np.random.randint(15, 35))
+            sizes.append(int(rng.integers(15, 35)))
         
         # Normalize to 100%
         total = sum(sizes)
@@ -111,16 +211,16 @@ class ChartService:
             'title': title
         }
     
-    def _generate_scatter_data(self, title, bullets):
+    def _generate_scatter_data(self, title, bullets, rng):
         """Generate scatter plot data"""
         n_points = 20
-        x_data = np.random.normal(50, 15, n_points)
-        y_data = x_data + np.random.normal(0, 10, n_points)
+        x_data = rng.normal(50, 15, n_points)
+        y_data = x_data + rng.normal(0, 10, n_points)
         
         return {
             'type': 'scatter',
-            'x_data': x_data,
-            'y_data': y_data,
+            'x_data': x_data.round(2).tolist(),
+            'y_data': y_data.round(2).tolist(),
             'title': title
         }
     
@@ -148,10 +248,37 @@ class ChartService:
                 'title': 'Performance'
             }
     
-    def create_chart_image(self, chart_data, style='modern', size=(8, 6)):
-        """Create chart image using matplotlib"""
+    def image_key(self, visual_type, data, style='modern'):
+        """Cache key of the image create_chart_image / create_table_image returns for a 'chart', 'pie' or 'table' visual"""
+        if visual_type == 'table':
+            return self._table_key(data, style, TABLE_IMAGE_SIZE)
+        return self._chart_key(data, style, CHART_IMAGE_SIZE)
+
+    def render_image(self, visual_type, data, style='modern'):
+        """Render a 'chart', 'pie' or 'table' visual without the cache (for the render pool)"""
+        if visual_type == 'table':
+            return self._render_table_image(data, style, TABLE_IMAGE_SIZE)
+        return self._render_chart_image(data, style, CHART_IMAGE_SIZE)
+
+    def create_chart_image(self, chart_data, style='modern', size=CHART_IMAGE_SIZE):
+        """Create chart image using matplotlib (cached by chart data, style and size)"""
+        key = self._chart_key(chart_data, style, size)
+        cached = self.image_cache.get(key)
+        if cached is not None:
+            return cached
+
+        png = self._render_chart_image(chart_data, style, size)
+        if png:
+            self.image_cache.put(key, png)
+        return png
+
+    def _chart_key(self, chart_data, style, size):
+        return self.image_cache.make_key('chart', chart_data, style, size, _image_dpi(size))
+
+    def _render_chart_image(self, chart_data, style, size):
+        fig = self.figure_pool.acquire(size)
         try:
-            fig, ax = plt.subplots(figsize=size)
+            ax = fig.add_subplot()
             
             # Set style based on design
             if style == 'modern':
@@ -159,7 +286,7 @@ class ChartService:
             elif style == 'corporate':
                 colors = ['#2c3e50', '#34495e', '#7f8c8d', '#95a5a6', '#bdc3c7', '#ecf0f1']
             else:
-                colors = plt.cm.Set3(np.linspace(0, 1, 6))
+                colors = matplotlib.colormaps['Set3'](np.linspace(0, 1, 6))
             
             chart_type = chart_data['type']
             
@@ -180,12 +307,17 @@ class ChartService:
                 ax.grid(True, alpha=0.3)
                 
             elif chart_type == 'pie':
+                labels = [str(label) for label in chart_data['labels']]
+                legend = not _pie_labels_fit(labels)
                 wedges, texts, autotexts = ax.pie(chart_data['sizes'], 
-                                                 labels=chart_data['labels'],
+                                                 labels=None if legend else labels,
                                                  colors=colors,
                                                  autopct='%1.1f%%',
                                                  startangle=90)
                 ax.axis('equal')
+                if legend:
+                    ax.legend(wedges, [textwrap.fill(label, PIE_LEGEND_WRAP) for label in labels],
+                              loc='center left', bbox_to_anchor=(1.02, 0.5), frameon=False)
                 
             elif chart_type == 'scatter':
                 ax.scatter(chart_data['x_data'], chart_data['y_data'], 
@@ -197,27 +329,183 @@ class ChartService:
             # Set title
             ax.set_title(chart_data['title'], fontsize=14, fontweight='bold', pad=20)
             
-            # Improve layout
-            plt.tight_layout()
-            
-            # Save to bytes
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='PNG', dpi=150, bbox_inches='tight')
-            img_buffer.seek(0)
-            
-            plt.close(fig)  # Clean up
+            # Fixed layout - a single draw
+            if chart_type == 'pie':
+                fig.subplots_adjust(**(PIE_LEGEND_LAYOUT if legend else PIE_LAYOUT))
+            else:
+                fig.subplots_adjust(**CHART_LAYOUT)
             
-            return img_buffer.getvalue()
+            return self._encode_png(fig, size)
             
         except Exception as e:
             print(f"[CHART_CREATE] Error: {e}")
             return None
+        finally:
+            self.figure_pool.release(fig)  # Clean up
+    
+    def _encode_png(self, fig, size):
+        """Draw fig at the visual box's target dpi and encode it as a palette PNG"""
+        fig.set_dpi(_image_dpi(size))
+        fig.set_facecolor('white')
+        fig.canvas.draw()
+        image = Image.fromarray(np.asarray(fig.canvas.buffer_rgba())).convert('RGB')
+        
+        # Flat fills and anti-aliased text fit a 256-color palette - about a third of the RGB size
+        if RASTER_PNG_COLORS:
+            image = image.quantize(colors=RASTER_PNG_COLORS, method=Image.Quantize.FASTOCTREE)
+        
+        img_buffer = io.BytesIO()
+        image.save(img_buffer, format='PNG', optimize=True)
+        return img_buffer.getvalue()
     
-    def create_table_data(self, slide_content):
-        """Create meaningful, readable table data using pandas"""
+    def add_native_chart(self, slide, chart_data, left, top, width, height, design_style='minimal_1'):
+        """Add chart_data as an editable PowerPoint chart styled from the design colors"""
+        from pptx.chart.data import CategoryChartData, XyChartData
+        from pptx.enum.chart import XL_CHART_TYPE
+
+        chart_type = chart_data['type']
+        if chart_type == 'scatter':
+            data = XyChartData()
+            series = data.add_series('Values')
+            for x, y in zip(chart_data['x_data'], chart_data['y_data']):
+                series.add_data_point(round(float(x), 2), round(float(y), 2))
+            xl_chart_type = XL_CHART_TYPE.XY_SCATTER
+        else:
+            if chart_type == 'pie':
+                categories, values = chart_data['labels'], chart_data['sizes']
+                xl_chart_type = XL_CHART_TYPE.PIE
+            elif chart_type == 'line':
+                categories, values = chart_data['x_data'], chart_data['y_data']
+                xl_chart_type = XL_CHART_TYPE.LINE_MARKERS
+            else:
+                categories, values = chart_data['categories'], chart_data['values']
+                xl_chart_type = XL_CHART_TYPE.COLUMN_CLUSTERED
+            data = CategoryChartData()
+            data.categories = [str(category) for category in categories]
+            data.add_series('Values', [float(value) for value in values])
+
+        graphic_frame = slide.shapes.add_chart(xl_chart_type, left, top, width, height, data)
+        self._style_native_chart(graphic_frame.chart, chart_type, chart_data.get('title'), design_style)
+        return graphic_frame
+
+    def _style_native_chart(self, chart, chart_type, title, design_style):
+        """Design-style fonts and series colors; the chart area stays transparent over the slide background"""
+        from pptx.enum.chart import XL_LEGEND_POSITION, XL_LABEL_POSITION, XL_MARKER_STYLE
+        from pptx.util import Pt
+
+        colors = _native_chart_colors(design_style)
+
+        chart.font.name = 'Calibri'
+        chart.font.size = Pt(11)
+        chart.font.color.rgb = colors['text']
+
+        if title:
+            chart.has_title = True
+            title_frame = chart.chart_title.text_frame
+            title_frame.text = title
+            title_font = title_frame.paragraphs[0].runs[0].font
+            title_font.size = Pt(14)
+            title_font.bold = True
+            title_font.color.rgb = colors['title']
+        else:
+            chart.has_title = False
+
+        plot = chart.plots[0]
+        series = plot.series[0]
+
+        if chart_type == 'pie':
+            plot.vary_by_categories = True
+            for index, point in enumerate(series.points):
+                point.format.fill.solid()
+                point.format.fill.fore_color.rgb = colors['palette'][index % len(colors['palette'])]
+            plot.has_data_labels = True
+            plot.data_labels.show_percentage = True
+            plot.data_labels.show_value = False
+            plot.data_labels.number_format = '0.0%'
+            plot.data_labels.number_format_is_linked = False
+            chart.has_legend = True
+            chart.legend.position = XL_LEGEND_POSITION.BOTTOM
+            chart.legend.include_in_layout = False
+            return
+
+        chart.has_legend = False
+        value_axis = chart.value_axis
+        value_axis.has_major_gridlines = True
+        value_axis.major_gridlines.format.line.color.rgb = colors['grid']
+        value_axis.format.line.fill.background()
+
+        if chart_type == 'bar':
+            plot.vary_by_categories = True
+            plot.gap_width = 60
+            for index, point in enumerate(series.points):
+                point.format.fill.solid()
+                point.format.fill.fore_color.rgb = colors['palette'][index % len(colors['palette'])]
+            plot.has_data_labels = True
+            plot.data_labels.number_format = '0'
+            plot.data_labels.number_format_is_linked = False
+            plot.data_labels.position = XL_LABEL_POSITION.OUTSIDE_END
+        else:
+            # line and scatter: one accent-colored series with round markers
+            if chart_type == 'line':
+                series.format.line.color.rgb = colors['palette'][0]
+                series.format.line.width = Pt(3)
+            series.marker.style = XL_MARKER_STYLE.CIRCLE
+            series.marker.size = 8
+            series.marker.format.fill.solid()
+            series.marker.format.fill.fore_color.rgb = colors['palette'][0]
+            series.marker.format.line.color.rgb = colors['palette'][0]
+
+    def add_native_table(self, slide, table_data, left, top, width, height, design_style='minimal_1'):
+        """Add table_data as a PowerPoint table: accent header row, banded body rows"""
+        from pptx.enum.text import MSO_ANCHOR, PP_ALIGN
+        from pptx.util import Pt, Inches
+
+        rows = table_data.rows[:6]  # Max 6 rows for readability
+        columns = table_data.columns
+        colors = _native_table_colors(design_style)
+        left, top, width, height = (int(value) for value in (left, top, width, height))
+
+        graphic_frame = slide.shapes.add_table(len(rows) + 1, len(columns), left, top, width, height)
+        table = graphic_frame.table
+        table.first_row = True
+        table.horz_banding = True
+
+        # First column holds the labels - give it the most room
+        first_width = int(width * 0.4) if len(columns) > 1 else width
+        table.columns[0].width = first_width
+        for column in list(table.columns)[1:]:
+            column.width = (width - first_width) // (len(columns) - 1)
+
+        for row_index, values in enumerate([columns] + rows):
+            header = row_index == 0
+            fill = colors['header'] if header else colors['band'][row_index % 2]
+            for column_index, value in enumerate(values):
+                cell = table.cell(row_index, column_index)
+                cell.fill.solid()
+                cell.fill.fore_color.rgb = fill
+                cell.vertical_anchor = MSO_ANCHOR.MIDDLE
+                cell.margin_left = cell.margin_right = Inches(0.08)
+                cell.margin_top = cell.margin_bottom = Inches(0.04)
+
+                text_frame = cell.text_frame
+                text_frame.text = str(value)
+                paragraph = text_frame.paragraphs[0]
+                paragraph.alignment = PP_ALIGN.LEFT if column_index == 0 else PP_ALIGN.CENTER
+                font = paragraph.runs[0].font if paragraph.runs else paragraph.font
+                font.name = 'Calibri'
+                font.size = Pt(12 if header else 11)
+                font.bold = header
+                font.color.rgb = colors['header_text'] if header else colors['text']
+
+        print(f"[TABLE_NATIVE] Created table with {len(rows)} rows, {len(columns)} columns")
+        return graphic_frame
+
+    def create_table_data(self, slide_content, design_style=None):
+        """Create meaningful, readable table data as a TableData (the same slide and style always give the same table)"""
         try:
             title = slide_content.get('title', 'Data Table')
             bullets = slide_content.get('bullets', [])
+            rng = _content_rng('table', title, bullets, design_style)
             
             # Generate table based on content with better structure
             if len(bullets) >= 3:
@@ -232,17 +520,17 @@ class ChartService:
                     category = category.replace('•', '').strip()  # Remove bullet points
                     
                     # Generate realistic business values
-                    value_types = ['${}K'.format(np.random.randint(50, 500)),
-                                  '{}%'.format(np.random.randint(5, 95)),
-                                  '{}'.format(np.random.randint(100, 9999)),
-                                  '{}M'.format(round(np.random.uniform(1.0, 10.0), 1))]
+                    value_types = ['${}K'.format(rng.integers(50, 500)),
+                                  '{}%'.format(rng.integers(5, 95)),
+                                  '{}'.format(rng.integers(100, 9999)),
+                                  '{}M'.format(round(rng.uniform(1.0, 10.0), 1))]
                     
-                    value = np.random.choice(value_types)
-                    performance = np.random.choice(['Excellent', 'Good', 'Growing', 'Strong', 'Improving'])
+                    value = rng.choice(value_types)
+                    performance = rng.choice(['Excellent', 'Good', 'Growing', 'Strong', 'Improving'])
                     
-                    data.append([category[:20], value, performance])  # Limit category length
+                    data.append([category[:20], str(value), str(performance)])  # Limit category length
                 
-                df = pd.DataFrame(data, columns=headers)
+                table = TableData(headers, data)
             else:
                 # Create contextual default table based on title
                 title_lower = title.lower()
@@ -280,13 +568,13 @@ class ChartService:
                         'Rating': ['4.2★', '3.9★', '4.5★', '3.7★']
                     }
                 
-                df = pd.DataFrame(data)
+                table = TableData.from_columns(data)
             
             # Add table name for potential title
-            df.name = title if title != 'Data Table' else None
+            table.title = title if title != 'Data Table' else None
             
-            print(f"[TABLE_DATA] Created table with {len(df)} rows, {len(df.columns)} columns")
-            return df
+            print(f"[TABLE_DATA] Created table with {len(table)} rows, {len(table.columns)} columns")
+            return table
             
         except Exception as e:
             print(f"[TABLE_CREATE] Error: {e}")
@@ -296,23 +584,38 @@ class ChartService:
                 'Value': ['100', '150', '120'],
                 'Status': ['Good', 'Great', 'Fair']
             }
-            return pd.DataFrame(data)
+            return TableData.from_columns(data)
     
-    def create_table_image(self, df, style='modern', size=(8, 5)):
-        """Create beautiful, professional table image using matplotlib"""
+    def create_table_image(self, table_data, style='modern', size=TABLE_IMAGE_SIZE):
+        """Create beautiful, professional table image using matplotlib (cached by content, style and size)"""
+        key = self._table_key(table_data, style, size)
+        cached = self.image_cache.get(key)
+        if cached is not None:
+            return cached
+
+        png = self._render_table_image(table_data, style, size)
+        if png:
+            self.image_cache.put(key, png)
+        return png
+
+    def _table_key(self, table_data, style, size):
+        return self.image_cache.make_key('table', [table_data.columns, table_data.rows[:6], table_data.title],
+                                         style, size, _image_dpi(size))
+
+    def _render_table_image(self, table_data, style, size):
+        fig = self.figure_pool.acquire(size)
         try:
             # Create figure with better proportions for slide
-            fig, ax = plt.subplots(figsize=size)
-            ax.axis('tight')
+            ax = fig.add_subplot()
             ax.axis('off')
             
             # Limit table size for better readability
-            if len(df) > 6:
-                df = df.head(6)  # Max 6 rows for readability
+            rows = table_data.rows[:6]  # Max 6 rows for readability
+            columns = table_data.columns
             
             # Create table with better styling
-            table = ax.table(cellText=df.values,
-                           colLabels=df.columns,
+            table = ax.table(cellText=rows,
+                           colLabels=columns,
                            cellLoc='center',
                            loc='center',
                            bbox=[0, 0, 1, 1])  # Full figure
@@ -340,15 +643,15 @@ class ChartService:
                 text_color = '#374151'    # Dark gray text
             
             # Style header row
-            for i in range(len(df.columns)):
+            for i in range(len(columns)):
                 cell = table[(0, i)]
                 cell.set_facecolor(header_color)
                 cell.set_text_props(weight='bold', color='white', size=12)
                 cell.set_height(0.15)  # Header height
             
             # Style data rows with alternating colors
-            for i in range(1, len(df) + 1):
-                for j in range(len(df.columns)):
+            for i in range(1, len(rows) + 1):
+                for j in range(len(columns)):
                     cell = table[(i, j)]
                     # Alternate row colors for better readability
                     color = alt_color1 if i % 2 == 1 else alt_color2
@@ -360,29 +663,95 @@ class ChartService:
                     cell.set_edgecolor('#d1d5db')
                     cell.set_linewidth(0.5)
             
-            # Add title if DataFrame has a name
-            if hasattr(df, 'name') and df.name:
-                plt.title(df.name, fontsize=14, fontweight='bold', pad=15, color=text_color)
-            
-            # Improve layout
-            plt.tight_layout()
-            plt.subplots_adjust(top=0.9, bottom=0.1, left=0.1, right=0.9)
+            # Add title if the table has one
+            if table_data.title:
+                ax.set_title(table_data.title, fontsize=14, fontweight='bold', pad=15, color=text_color)
             
-            # Save to bytes with high quality
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='PNG', dpi=200, bbox_inches='tight', 
-                       facecolor='white', edgecolor='none')
-            img_buffer.seek(0)
+            # Fixed layout - the table fills the axes, so there is no margin to crop
+            fig.subplots_adjust(**(TABLE_TITLE_LAYOUT if table_data.title else TABLE_LAYOUT))
             
-            plt.close(fig)  # Clean up
+            png = self._encode_png(fig, size)
             
-            print(f"[TABLE_IMAGE] Created professional table with {len(df)} rows, {len(df.columns)} columns")
+            print(f"[TABLE_IMAGE] Created professional table with {len(rows)} rows, {len(columns)} columns")
             
-            return img_buffer.getvalue()
+            return png
             
         except Exception as e:
             print(f"[TABLE_IMAGE] Error: {e}")
             return None
+        finally:
+            self.figure_pool.release(fig)  # Clean up
+
+def _content_rng(kind, title, bullets, design_style):
+    """Private random generator seeded from a visual's kind, slide content and design style"""
+    payload = json.dumps([kind, title, [str(bullet) for bullet in bullets], design_style])
+    seed = int.from_bytes(hashlib.sha256(payload.encode('utf-8')).digest()[:8], 'big')
+    return np.random.default_rng(seed)
+
+
+def _pie_labels_fit(labels) -> bool:
+    """Whether every label fits beside the pie - measured from the font, without drawing"""
+    font = FontProperties(size=matplotlib.rcParams['font.size'])
+    for label in labels:
+        width, _, _ = text_to_path.get_text_width_height_descent(label, font, ismath=False)
+        if width / 72 > PIE_INLINE_LABEL_INCHES:
+            return False
+    return True
+
+
+def _image_dpi(size):
+    """dpi at which a figure of size (inches) fills the visual box at VISUAL_TARGET_DPI"""
+    return VISUAL_TARGET_DPI * VISUAL_BOX_INCHES[0] / size[0]
+
+
+# Series colors after the design accent (the matplotlib 'modern' palette)
+NATIVE_CHART_PALETTE = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6', '#1abc9c']
+
+
+def _native_chart_colors(design_style):
+    """Text, title, gridline and series colors for a native chart in design_style"""
+    from pptx.dml.color import RGBColor
+    from design_styles import get_design_style
+    from theme_engine import hex_to_rgb
+
+    try:
+        style_colors = get_design_style(design_style)['colors']
+        text, title, accent = style_colors['body'], style_colors['title'], style_colors['accent']
+    except Exception:
+        text, title, accent = '#44546a', '#1f3864', NATIVE_CHART_PALETTE[0]
+
+    palette = [accent] + [color for color in NATIVE_CHART_PALETTE if color.lower() != accent.lower()]
+    text_rgb = hex_to_rgb(text)
+    # Gridlines: the text color at low contrast, mixed towards mid gray
+    grid = RGBColor(*[(channel + 128) // 2 for channel in text_rgb])
+    return {
+        'text': text_rgb,
+        'title': hex_to_rgb(title),
+        'grid': grid,
+        'palette': [hex_to_rgb(color) for color in palette]
+    }
+
+
+def _native_table_colors(design_style):
+    """Header fill from the design accent; the body rows keep the light bands of the table image"""
+    from pptx.dml.color import RGBColor
+    from design_styles import get_design_style
+    from theme_engine import hex_to_rgb
+
+    try:
+        header = hex_to_rgb(get_design_style(design_style)['colors']['accent'])
+    except Exception:
+        header = RGBColor(0x2C, 0x3E, 0x50)
+
+    # Dark text on light accents (e.g. gold), white on dark ones
+    luminance = 0.299 * header[0] + 0.587 * header[1] + 0.114 * header[2]
+    return {
+        'header': header,
+        'header_text': RGBColor(0x2C, 0x3E, 0x50) if luminance > 160 else RGBColor(0xFF, 0xFF, 0xFF),
+        'band': [RGBColor(0xFF, 0xFF, 0xFF), RGBColor(0xEC, 0xF0, 0xF1)],
+        'text': RGBColor(0x2C, 0x3E, 0x50)
+    }
+
 
 # Global instance
 chart_service = ChartService()
\ No newline at end of file
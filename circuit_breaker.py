@@ -0,0 +1,106 @@
+# circuit_breaker.py
+# Circuit breaker with background half-open probing
+
+import threading
+import time
+from typing import Callable, Dict
+from config import LLM_BREAKER_FAILURE_THRESHOLD, LLM_BREAKER_RESET_SECONDS
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Trip after consecutive failures and route traffic to the fallback while open
+
+    Requests never wait on a probe: once open, a background thread checks the
+    backend with probe() every reset_seconds (state half_open while a probe is
+    running) and closes the breaker as soon as a probe succeeds.
+    """
+
+    def __init__(self, probe: Callable[[], bool], name: str = "llm",
+                 failure_threshold: int = LLM_BREAKER_FAILURE_THRESHOLD,
+                 reset_seconds: float = LLM_BREAKER_RESET_SECONDS):
+        self.probe = probe
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+        self._probe_thread = None
+
+        self.stats = {
+            "trips": 0,
+            "short_circuited": 0,
+            "probes": 0,
+            "failed_probes": 0
+        }
+
+    def allow_request(self) -> bool:
+        """True if the request should go to the backend, False to use the fallback"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            self.stats["short_circuited"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self._trip()
+
+    def _trip(self):
+        """Open the breaker and start probing in the background (caller holds the lock)"""
+        self.state = OPEN
+        self.opened_at = time.time()
+        self.stats["trips"] += 1
+        print(f"[BREAKER] {self.name} circuit OPEN after {self.consecutive_failures} consecutive failures - using fallback")
+
+        if self._probe_thread is None or not self._probe_thread.is_alive():
+            self._probe_thread = threading.Thread(target=self._probe_loop, name=f"{self.name}-breaker-probe", daemon=True)
+            self._probe_thread.start()
+
+    def _probe_loop(self):
+        """Probe the backend until it recovers, then close the breaker"""
+        while True:
+            time.sleep(self.reset_seconds)
+
+            with self._lock:
+                self.state = HALF_OPEN
+                self.stats["probes"] += 1
+
+            try:
+                healthy = bool(self.probe())
+            except Exception as e:
+                print(f"[BREAKER] {self.name} probe error: {e}")
+                healthy = False
+
+            with self._lock:
+                if healthy:
+                    self.state = CLOSED
+                    self.consecutive_failures = 0
+                    self.opened_at = None
+                    print(f"[BREAKER] {self.name} circuit CLOSED - backend recovered")
+                    return
+
+                self.state = OPEN
+                self.stats["failed_probes"] += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "open_for": time.time() - self.opened_at if self.opened_at else 0.0,
+                **self.stats
+            }
@@ -71,6 +71,16 @@ SUBSCRIPTION_PLANS = {
         'visual_elements': True,
         'price': 25,
         'description': 'Ultimate presentation power'
+    },
+    'enterprise': {
+        'name': 'Enterprise',
+        'daily_limit': 20,
+        'total_limit': None,
+        'max_slides': 200,  # MAX_DECK_SLIDES - decks from STREAMING_WRITER_MIN_SLIDES up are streamed
+        'has_ads': False,
+        'visual_elements': True,
+        'price': 50,
+        'description': 'Large decks of up to 200 slides'
     }
 }
 
@@ -149,7 +159,98 @@ PEXELS_API_KEY = 'rVZGuMgTaTyfgTL08XtLUcl2xfuMJjJL0apbLaypa4ShkXwnOznhYP51'
 # Image API Settings
 IMAGE_SEARCH_RESULTS_LIMIT = 10
 IMAGE_DOWNLOAD_TIMEOUT = 30
-IMAGE_MAX_SIZE = 2048  # Max width/height in pixels
+IMAGE_MAX_SIZE = 2048  # Max width/height in pixels (photos saved to disk; slide images are sized to their box)
+IMAGE_PREFETCH_WORKERS = 8  # Concurrent image searches/downloads per deck
+IMAGE_PREFETCH_DEADLINE = 10  # seconds after an image's fetch starts until its slide stops waiting for it
+
+# LLM Configuration
+LLM_BACKEND = os.environ.get('LLM_BACKEND', 'ollama')  # 'ollama', 'openai' (llama.cpp/vLLM/LM Studio servers) or 'stub'
+OLLAMA_URL = os.environ.get('OLLAMA_URL', 'http://localhost:11434/api/generate')
+OLLAMA_URLS = [url.strip() for url in os.environ.get('OLLAMA_URLS', OLLAMA_URL).split(',') if url.strip()]  # Comma-separated replicas
+OPENAI_COMPAT_URL = os.environ.get('OPENAI_COMPAT_URL', 'http://localhost:8080/v1/chat/completions')
+OPENAI_COMPAT_URLS = [url.strip() for url in os.environ.get('OPENAI_COMPAT_URLS', OPENAI_COMPAT_URL).split(',') if url.strip()]
+LLM_MODEL = os.environ.get('LLM_MODEL', 'qwen2.5:7b-instruct')
+LLM_TIMEOUT = 120  # seconds per LLM request
+LLM_KEEP_ALIVE = os.environ.get('LLM_KEEP_ALIVE', '30m')  # Keep the model (and its prompt cache) loaded between requests
+
+# LLM Model Routing Configuration
+LLM_SMALL_MODEL = os.environ.get('LLM_SMALL_MODEL', 'qwen2.5:3b-instruct')
+LLM_SMALL_MODEL_PLANS = ['free']  # Plans whose decks always use the small model
+LLM_SMALL_DECK_MAX_SLIDES = 3  # Decks up to this size use the small model on any plan
+LLM_ROUTES = {  # latency_budget is the request timeout in seconds for the route
+    'title': {'model': LLM_SMALL_MODEL, 'latency_budget': 20},
+    'deck_small': {'model': LLM_SMALL_MODEL, 'latency_budget': 60},
+    'deck': {'model': LLM_MODEL, 'latency_budget': LLM_TIMEOUT}
+}
+
+# Semantic Prompt Cache Configuration
+PROMPT_CACHE_ENABLED = True
+PROMPT_CACHE_THRESHOLD = 0.7  # Minimum estimated task similarity (0-1) to reuse a prior result
+PROMPT_CACHE_MAX_ENTRIES = 500
+PROMPT_CACHE_TTL = 24 * 3600  # seconds
+PROMPT_CACHE_NUM_PERM = 64  # MinHash permutations
+PROMPT_CACHE_BANDS = 16  # LSH bands (must divide PROMPT_CACHE_NUM_PERM)
+
+# LLM Replica Pool Configuration
+LLM_MAX_ATTEMPTS = 2  # Attempts per request, each on a different replica
+LLM_REPLICA_EJECT_AFTER = 3  # Consecutive failures before a replica is ejected
+LLM_REPLICA_EJECT_SECONDS = 30  # How long an ejected replica is skipped
+
+# LLM Circuit Breaker Configuration
+LLM_FALLBACK = os.environ.get('LLM_FALLBACK', 'demo')  # 'demo' (generate_demo_response) or 'error' (fail the job)
+LLM_BREAKER_FAILURE_THRESHOLD = 3  # Consecutive timeouts/errors before the breaker opens
+LLM_BREAKER_RESET_SECONDS = 15  # Wait before the first half-open probe, and between failed probes
+LLM_HEALTH_TIMEOUT = 5  # seconds for a backend health probe (a one-token generation)
+
+# LLM Request Queue Configuration
+LLM_MAX_IN_FLIGHT = int(os.environ.get('LLM_MAX_IN_FLIGHT', 2))  # Concurrent requests sent to the backend
+LLM_PLAN_PRIORITY = {  # Lower value is served first
+    'enterprise': 0,
+    'premium': 0,
+    'pro': 1,
+    'elite': 2,
+    'free': 3
+}
+
+# Parallel Rendering Configuration
+PARALLEL_RENDER_ENABLED = True
+PARALLEL_RENDER_MIN_SLIDES = 8  # Smaller decks render in-process - the pool round trip outweighs the gain
+RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', max(1, (os.cpu_count() or 1) - 1)))  # Render processes per app worker
+VISUAL_PRERENDER_ENABLED = True  # Rasterize a deck's matplotlib charts/tables in the render pool before assembly
+VISUAL_PRERENDER_MIN_VISUALS = 2  # Fewer uncached visuals render inline
+
+# Streaming Writer Configuration
+STREAMING_WRITER_MIN_SLIDES = 30  # Larger decks are written slide by slide, so memory stays flat
+MAX_DECK_SLIDES = 200  # Hard cap on slides per deck
+
+# Chart Configuration
+CHART_ENGINE = os.environ.get('CHART_ENGINE', 'native')  # 'native' (editable PowerPoint charts) or 'matplotlib' (PNG)
+TABLE_ENGINE = os.environ.get('TABLE_ENGINE', 'native')  # 'native' (PowerPoint table) or 'matplotlib' (PNG)
+
+# Chart Image Cache Configuration
+CHART_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Rendered chart/table PNGs kept in memory per process (LRU)
+CHART_CACHE_DIR = os.environ.get('CHART_CACHE_DIR', '')  # Disk tier shared across restarts (empty disables it)
+CHART_CACHE_DISK_MAX_BYTES = 512 * 1024 * 1024
+CHART_FIGURE_POOL_SIZE = 4  # Cleared matplotlib figures kept for reuse per figure size
+
+# Raster Visual Budget Configuration
+VISUAL_TARGET_DPI = int(os.environ.get('VISUAL_TARGET_DPI', 150))  # Pixel density of charts, tables and photos in their slide box
+RASTER_PNG_COLORS = 256  # Palette size for chart/table PNGs (0 keeps full RGB)
+IMAGE_JPEG_QUALITY = 85  # Starting quality for photos
+IMAGE_JPEG_MIN_QUALITY = 60
+IMAGE_JPEG_MAX_BYTES = 150 * 1024  # Quality steps down until a photo fits (or reaches IMAGE_JPEG_MIN_QUALITY)
+
+# Restyle Configuration
+RESTYLE_MAX_STYLES = 4  # Design styles one restyle request may render
+
+# Slide Preview Configuration
+PREVIEW_WIDTH = 480  # Default thumbnail width in pixels
+PREVIEW_MAX_WIDTH = 1280
+PREVIEW_CACHE_SIZE = 512  # Thumbnails kept in memory across jobs (LRU)
+
+# Package Writer Configuration
+PACKAGE_XML_COMPRESSLEVEL = int(os.environ.get('PACKAGE_XML_COMPRESSLEVEL', 6))  # zlib level for XML parts (1 fastest - 9 smallest)
+PACKAGE_STORE_MEDIA = True  # Store JPEG/PNG/xlsx parts uncompressed (they are already compressed)
 
 # Job Processing Configuration
 JOB_TIMEOUT = 300  # 5 minutes timeout for PPT generation
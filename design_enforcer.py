@@ -142,7 +142,12 @@ def enforce_design(slide, layout_info):
             p.alignment = PP_ALIGN.LEFT
 
     # Ensure color contrast for all text shapes
-    for shape in slide.shapes:
+    enforce_text_contrast(slide.shapes)
+
+
+def enforce_text_contrast(shapes):
+    """Give every paragraph without an explicit color a readable default"""
+    for shape in shapes:
         if shape.has_text_frame:
             for p in shape.text_frame.paragraphs:
                 # Only set default if no color is explicitly set
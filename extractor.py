@@ -94,19 +94,14 @@ def clean_detailed_text(text: str) -> str:
     
     return "\n".join(final_lines)
 
-def build_prompt(content: str, task: str, slide_count: int = 10) -> str:
-    return f"""
+# Static instruction block shared by every deck prompt. It contains nothing
+# request-specific so the LLM server can reuse its prompt cache for it.
+PROMPT_PREFIX = """
 You are an expert presentation creator. Create a comprehensive presentation with DETAILED, INFORMATIVE content.
 
-TASK: {task}
-SLIDES REQUIRED: {slide_count} slides (MUST generate exactly {slide_count} unique slides)
-
-CONTENT TO USE:
-{content[:4000]}
-
 CRITICAL REQUIREMENTS:
 1. FIRST SLIDE: Title slide only with just the main topic title (no bullets, no content)
-2. REMAINING SLIDES (2-{slide_count}): Content slides with detailed information
+2. REMAINING SLIDES: Content slides with detailed information
 3. Each content slide must have 4-6 detailed bullet points with specific information
 4. Use the provided content to create informative, educational slides with real facts
 5. NO generic headings - use specific, descriptive titles based on the content
@@ -114,18 +109,18 @@ CRITICAL REQUIREMENTS:
 7. Make each slide substantive and informative with unique, non-repeating content
 
 SLIDE STRUCTURE:
-- Slide 1: Title only (slide_type: "title", no bullets)
-- Slides 2-{slide_count}: Content slides (slide_type: "content", with detailed bullets)
+- First slide: Title only (slide_type: "title", no bullets)
+- All remaining slides: Content slides (slide_type: "content", with detailed bullets)
 
 EXAMPLE OF PERFECT STRUCTURE:
-{{
+{
   "slides": [
-    {{
+    {
       "slide_type": "title",
       "title": "Artificial Intelligence in Healthcare",
       "bullets": []
-    }},
-    {{
+    },
+    {
       "slide_type": "content", 
       "title": "AI-Powered Medical Imaging and Diagnostics",
       "bullets": [
@@ -135,19 +130,19 @@ EXAMPLE OF PERFECT STRUCTURE:
         "• Machine learning systems can identify diabetic retinopathy from retinal photographs with 90% accuracy",
         "• AI-assisted pathology helps detect rare diseases that human pathologists might miss in tissue samples"
       ]
-    }}
+    }
   ]
-}}
+}
 
 OUTPUT FORMAT (EXACT JSON):
-{{
+{
   "slides": [
-    {{
+    {
       "slide_type": "title",
       "title": "Main Topic Title Here",
       "bullets": []
-    }},
-    {{
+    },
+    {
       "slide_type": "content",
       "title": "Specific Descriptive Subtitle Based on Content",
       "bullets": [
@@ -157,10 +152,122 @@ OUTPUT FORMAT (EXACT JSON):
         "• Fourth point with real-world examples or case studies from content",
         "• Fifth point with specific conclusions or actionable insights"
       ]
+    }
+  ]
+}
+"""
+
+
+def build_prompt_parts(content: str, task: str, slide_count: int = 10) -> tuple:
+    """
+    Split the deck prompt into (static prefix, per-request suffix)
+
+    The prefix is always PROMPT_PREFIX; only the suffix varies between requests.
+    """
+    suffix = f"""
+CONTENT TO USE:
+{content[:4000]}
+
+TASK: {task}
+SLIDES REQUIRED: {slide_count} slides (MUST generate exactly {slide_count} unique slides)
+- Slide 1: Title only
+- Slides 2-{slide_count}: Content slides
+
+GENERATE EXACTLY {slide_count} SLIDES WITH RICH, DETAILED INFORMATION FROM THE PROVIDED CONTENT:
+"""
+    return PROMPT_PREFIX, suffix
+
+
+def build_prompt(content: str, task: str, slide_count: int = 10) -> str:
+    prefix, suffix = build_prompt_parts(content, task, slide_count)
+    return prefix + suffix
+
+def build_continuation_prompt(content: str, task: str, existing_titles: list, missing_count: int, total_count: int) -> str:
+    """Prompt for only the slides missing from a truncated response"""
+    first_missing = total_count - missing_count + 1
+    titles = "\n".join(f"{i + 1}. {title}" for i, title in enumerate(existing_titles))
+    return f"""
+You are an expert presentation creator continuing a presentation that is already partly written.
+
+TASK: {task}
+SLIDES REQUIRED: {missing_count} slides (slides {first_missing}-{total_count} of {total_count})
+
+SLIDES ALREADY WRITTEN (do NOT repeat these topics):
+{titles}
+
+CONTENT TO USE:
+{content[:4000]}
+
+CRITICAL REQUIREMENTS:
+1. Generate ONLY the {missing_count} missing content slides, continuing after the slides above
+2. Each slide must have slide_type "content" and 4-6 detailed bullet points with specific information
+3. Use specific, descriptive titles that do not duplicate the existing titles
+4. Include facts, statistics, examples, and detailed explanations from the source material
+
+OUTPUT FORMAT (EXACT JSON):
+{{
+  "slides": [
+    {{
+      "slide_type": "content",
+      "title": "Specific Descriptive Subtitle Based on Content",
+      "bullets": [
+        "• Detailed informative bullet point with specific facts from the source",
+        "• Another detailed point with examples, statistics, or real data"
+      ]
     }}
   ]
 }}
 
-GENERATE EXACTLY {slide_count} SLIDES WITH RICH, DETAILED INFORMATION FROM THE PROVIDED CONTENT:
+GENERATE EXACTLY {missing_count} NEW SLIDES:
 """
 
+
+def build_slide_prompt(content: str, task: str, deck_titles: list, slide_number: int, current_slide: dict,
+                       instructions: str = None) -> str:
+    """Prompt for a replacement of one slide in an existing deck"""
+    titles = "\n".join(f"{i + 1}. {title}" for i, title in enumerate(deck_titles))
+    current_bullets = "\n".join(current_slide.get("bullets", []))
+    slide_type = current_slide.get("slide_type", "content")
+    if slide_type == "title":
+        slide_rules = "2. The slide is the title slide: slide_type \"title\", a short presentation title and no bullets"
+    else:
+        slide_rules = f"2. The slide must have slide_type \"{slide_type}\" and 4-6 detailed bullet points with specific information"
+    request_line = f"\nUSER REQUEST FOR THIS SLIDE: {instructions}\n" if instructions else ""
+    return f"""
+You are an expert presentation creator rewriting one slide of an existing presentation.
+
+TASK: {task}
+SLIDES REQUIRED: 1 slides (replacement for slide {slide_number} of {len(deck_titles)})
+
+SLIDES IN THE PRESENTATION (do NOT repeat the other slides' topics):
+{titles}
+
+CURRENT VERSION OF SLIDE {slide_number}:
+{current_slide.get("title", "")}
+{current_bullets}
+{request_line}
+CONTENT TO USE:
+{content[:4000]}
+
+CRITICAL REQUIREMENTS:
+1. Generate ONLY the replacement for slide {slide_number}, covering the same place in the presentation
+{slide_rules}
+3. Use a specific, descriptive title that does not duplicate the other slides' titles
+4. Include facts, statistics, examples, and detailed explanations from the source material
+
+OUTPUT FORMAT (EXACT JSON):
+{{
+  "slides": [
+    {{
+      "slide_type": "{slide_type}",
+      "title": "Specific Descriptive Subtitle Based on Content",
+      "bullets": [
+        "• Detailed informative bullet point with specific facts from the source",
+        "• Another detailed point with examples, statistics, or real data"
+      ]
+    }}
+  ]
+}}
+
+GENERATE EXACTLY 1 REPLACEMENT SLIDE:
+"""
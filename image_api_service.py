@@ -1,15 +1,68 @@
 # image_api_service.py
 # External Image API Service for Unsplash and Pexels
 
+import functools
 import requests
 import os
 import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Optional
 from PIL import Image
 from config import (
     UNSPLASH_ACCESS_KEY, UNSPLASH_SECRET_KEY, UNSPLASH_APPLICATION_ID,
-    PEXELS_API_KEY, IMAGE_SEARCH_RESULTS_LIMIT, IMAGE_DOWNLOAD_TIMEOUT, IMAGE_MAX_SIZE
+    PEXELS_API_KEY, IMAGE_SEARCH_RESULTS_LIMIT, IMAGE_DOWNLOAD_TIMEOUT, IMAGE_MAX_SIZE,
+    VISUAL_TARGET_DPI, IMAGE_JPEG_QUALITY, IMAGE_JPEG_MIN_QUALITY, IMAGE_JPEG_MAX_BYTES, IMAGE_PREFETCH_WORKERS,
+    IMAGE_PREFETCH_DEADLINE
 )
 
+class PendingImage:
+    """
+    A slide image being fetched by ImageAPIService.prefetch
+
+    result() waits for this image only. The deadline runs from the moment a
+    prefetch thread starts the fetch, so time spent queued behind other decks
+    does not count against it; a fetch still queued when its slide is rendered
+    is taken off the queue and run inline, as it would have been without
+    the prefetch. A slow download gets the placeholder instead of holding up
+    the deck.
+    """
+
+    __slots__ = ("slide_index", "fetch", "deadline", "started_at", "future")
+
+    def __init__(self, slide_index, fetch, deadline):
+        self.slide_index = slide_index
+        self.fetch = fetch
+        self.deadline = deadline
+        self.started_at = None
+        self.future = None
+
+    def run(self) -> Optional[bytes]:
+        """Prefetch thread: fetch the image, recording when the fetch started"""
+        self.started_at = time.time()
+        return self.fetch()
+
+    def result(self) -> Optional[bytes]:
+        """JPEG bytes, or None if no image was found or it missed the deadline"""
+        try:
+            if self.future.cancel():
+                # Still queued - fetch it here rather than wait for a prefetch thread
+                return self.fetch()
+            started_at = self.started_at or time.time()
+            return self.future.result(timeout=max(0.0, started_at + self.deadline - time.time()))
+        except FutureTimeoutError:
+            self.future.cancel()
+            print(f"[IMAGE_PREFETCH] Slide {self.slide_index + 1} image missed its deadline - using placeholder")
+        except Exception as e:
+            print(f"[IMAGE_PREFETCH] Slide {self.slide_index + 1} failed: {e}")
+        return None
+
+    def cancel(self):
+        """Drop the fetch if it has not started (a slide that never asked for its image)"""
+        self.future.cancel()
+
+
 class ImageAPIService:
     def __init__(self):
         self.unsplash_headers = {
@@ -19,6 +72,8 @@ class ImageAPIService:
         self.pexels_headers = {
             'Authorization': PEXELS_API_KEY
         }
+        self._executor = None
+        self._lock = threading.Lock()
     
     def search_images(self, query, source='unsplash', limit=None):
         """Search for images from external APIs"""
@@ -110,8 +165,13 @@ class ImageAPIService:
             print(f"[PEXELS] Error: {e}")
             return []
     
-    def download_image(self, image_url, save_path=None):
-        """Download and process image from URL"""
+    def download_image(self, image_url, save_path=None, box=None):
+        """Download and process image from URL
+
+        box is the (width, height) in inches the image is placed in on the slide: the
+        image is scaled down to cover it at VISUAL_TARGET_DPI and its JPEG quality
+        lowered until it fits IMAGE_JPEG_MAX_BYTES.
+        """
         try:
             response = requests.get(image_url, timeout=IMAGE_DOWNLOAD_TIMEOUT)
             response.raise_for_status()
@@ -124,25 +184,41 @@ class ImageAPIService:
                 image = image.convert('RGB')
             
             # Resize if too large
-            if image.width > IMAGE_MAX_SIZE or image.height > IMAGE_MAX_SIZE:
+            if box:
+                # Smallest size that still covers the box at the target dpi (it is stretched to fill it)
+                scale = max(box[0] * VISUAL_TARGET_DPI / image.width, box[1] * VISUAL_TARGET_DPI / image.height)
+                if scale < 1:
+                    image = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                                         Image.Resampling.LANCZOS)
+            elif image.width > IMAGE_MAX_SIZE or image.height > IMAGE_MAX_SIZE:
                 image.thumbnail((IMAGE_MAX_SIZE, IMAGE_MAX_SIZE), Image.Resampling.LANCZOS)
             
+            jpeg_bytes = self._encode_jpeg(image)
+            
             # Save if path provided
             if save_path:
                 os.makedirs(os.path.dirname(save_path), exist_ok=True)
-                image.save(save_path, 'JPEG', quality=85, optimize=True)
+                with open(save_path, 'wb') as f:
+                    f.write(jpeg_bytes)
                 return save_path
             
             # Return image bytes
-            img_bytes = io.BytesIO()
-            image.save(img_bytes, format='JPEG', quality=85, optimize=True)
-            img_bytes.seek(0)
-            return img_bytes.getvalue()
+            return jpeg_bytes
             
         except Exception as e:
             print(f"[IMAGE_DOWNLOAD] Error downloading {image_url}: {e}")
             return None
     
+    def _encode_jpeg(self, image):
+        """JPEG bytes at the highest quality (from IMAGE_JPEG_QUALITY, in steps of 5) within IMAGE_JPEG_MAX_BYTES"""
+        quality = IMAGE_JPEG_QUALITY
+        while True:
+            img_bytes = io.BytesIO()
+            image.save(img_bytes, format='JPEG', quality=quality, optimize=True)
+            if img_bytes.tell() <= IMAGE_JPEG_MAX_BYTES or quality <= IMAGE_JPEG_MIN_QUALITY:
+                return img_bytes.getvalue()
+            quality = max(IMAGE_JPEG_MIN_QUALITY, quality - 5)
+    
     def get_image_for_slide(self, slide_content, slide_type='content'):
         """Get appropriate image for slide content"""
         try:
@@ -172,6 +248,39 @@ class ImageAPIService:
             print(f"[IMAGE_API] Error in get_image_for_slide: {e}")
             return None
     
+    def fetch_for_slide(self, slide_content, box=None):
+        """Search and download the image for a slide - JPEG bytes, or None when there is none"""
+        image_data = self.get_image_for_slide(slide_content)
+        if image_data and 'url' in image_data:
+            return self.download_image(image_data['url'], box=box)
+        return None
+    
+    def prefetch(self, slides: Dict[int, dict], box=None, deadline: float = IMAGE_PREFETCH_DEADLINE) -> Dict[int, PendingImage]:
+        """
+        Start fetching the images for several slides at once
+        
+        slides maps slide index to slide content. Searches and downloads run
+        concurrently on a pool of IMAGE_PREFETCH_WORKERS threads, so a deck waits
+        about one round trip instead of one per image slide. Returns immediately
+        with a PendingImage by slide index; each slide waits for its own image,
+        at most deadline seconds after its fetch starts.
+        """
+        if not slides:
+            return {}
+        
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=IMAGE_PREFETCH_WORKERS, thread_name_prefix='image-prefetch')
+            executor = self._executor
+        
+        print(f"[IMAGE_PREFETCH] Fetching {len(slides)} images in the background")
+        images = {}
+        for slide_index, slide_content in slides.items():
+            image = PendingImage(slide_index, functools.partial(self.fetch_for_slide, slide_content, box), deadline)
+            image.future = executor.submit(image.run)
+            images[slide_index] = image
+        return images
+    
     def _extract_keywords(self, slide_content, slide_type):
         """Extract relevant keywords from slide content"""
         keywords = []
@@ -4,6 +4,14 @@
 import time
 from typing import Dict, Any
 
+# Job status -> state reported by the API (PENDING, PROCESSING, DONE, FAILED)
+JOB_STATES = {
+    'pending': 'PENDING',
+    'processing': 'PROCESSING',
+    'completed': 'DONE',
+    'failed': 'FAILED'
+}
+
 # Simple in-memory job store
 jobs = {}
 job_stats = {
@@ -18,10 +26,13 @@ def create_job(job_id: str, job_data: Dict[str, Any]) -> None:
     jobs[job_id] = {
         'id': job_id,
         'status': 'pending',
+        'state': 'PENDING',
         'created_at': time.time(),
         'data': job_data,
         'result': None,
-        'error': None
+        'output': None,
+        'error': None,
+        'artifacts': {}
     }
     job_stats['total_jobs'] += 1
     job_stats['active_jobs'] += 1
@@ -30,6 +41,7 @@ def update_job_status(job_id: str, status: str, result: Any = None, error: str =
     """Update job status"""
     if job_id in jobs:
         jobs[job_id]['status'] = status
+        jobs[job_id]['state'] = JOB_STATES.get(status.lower(), status.upper())
         jobs[job_id]['updated_at'] = time.time()
         
         if result:
@@ -54,16 +66,28 @@ def get_job_stats() -> Dict[str, int]:
 
 def update_state(job_id: str, state: str) -> None:
     """Update job state (alias for update_job_status)"""
-    update_job_status(job_id, state)
+    update_job_status(job_id, state.lower())
 
 def complete_job(job_id: str, result: Any = None) -> None:
-    """Mark job as completed"""
+    """Mark job as completed - result is the path of the generated deck"""
+    if job_id in jobs:
+        jobs[job_id]['output'] = result
     update_job_status(job_id, 'completed', result=result)
 
 def fail_job(job_id: str, error: str = None) -> None:
     """Mark job as failed"""
     update_job_status(job_id, 'failed', error=error)
 
+def save_job_artifacts(job_id: str, **artifacts) -> None:
+    """Keep pipeline intermediates (extracted content, slides, design) for later edits of the deck"""
+    if job_id in jobs:
+        jobs[job_id]['artifacts'].update(artifacts)
+
+def get_job_artifacts(job_id: str) -> Dict[str, Any]:
+    """Pipeline intermediates saved for job_id (empty if none)"""
+    job = jobs.get(job_id)
+    return job['artifacts'] if job else {}
+
 def cleanup_old_jobs(max_age_hours: int = 24) -> None:
     """Clean up old jobs"""
     current_time = time.time()
@@ -0,0 +1,227 @@
+# llm_backends.py
+# Pluggable LLM backends - Ollama, OpenAI-compatible local servers and a deterministic stub
+
+import time
+import requests
+from config import LLM_BACKEND, OLLAMA_URLS, OPENAI_COMPAT_URLS, LLM_MODEL, LLM_TIMEOUT, LLM_MAX_ATTEMPTS, LLM_HEALTH_TIMEOUT, LLM_KEEP_ALIVE
+from llm_pool import EndpointPool
+
+# Default sampling options shared by every backend
+DEFAULT_OPTIONS = {
+    "temperature": 0.7,
+    "top_p": 0.9,
+    "num_ctx": 2048,
+    "num_predict": 1024,
+    "repeat_penalty": 1.1
+}
+
+
+class LLMBackend:
+    """Base class for LLM backends - generate() returns the raw completion text"""
+
+    name = "base"
+
+    def __init__(self, model: str = LLM_MODEL, urls: list = None):
+        self.model = model
+        self.pool = EndpointPool(urls) if urls else None
+
+    def generate(self, prompt: str, response_format=None, options: dict = None, timeout: float = LLM_TIMEOUT, prefix: str = None, model: str = None) -> str:
+        """
+        Generate a completion
+
+        Args:
+            prompt: Full prompt text
+            response_format: "json" or a JSON schema dict to constrain the output
+            options: Sampling options (see DEFAULT_OPTIONS)
+            timeout: Request timeout in seconds
+            prefix: Static instruction block sent ahead of prompt. Backends send
+                    it as a separate system message so the server can reuse its
+                    prompt cache for it across requests.
+            model: Model override for this request (default: self.model)
+
+        Raises requests exceptions on transport errors so the caller can fall back.
+        """
+        raise NotImplementedError
+
+    def _post(self, payload: dict, timeout: float) -> dict:
+        """
+        POST payload to a replica from the pool and return the JSON body
+
+        Connection errors, timeouts and 5xx responses are retried on a different
+        replica, up to LLM_MAX_ATTEMPTS; the last error is raised.
+        """
+        tried = set()
+        last_error = None
+
+        for attempt in range(min(LLM_MAX_ATTEMPTS, len(self.pool))):
+            replica = self.pool.acquire(exclude=tried)
+            if replica is None:
+                break
+            tried.add(replica.url)
+
+            start = time.time()
+            try:
+                response = requests.post(replica.url, json=payload, timeout=timeout)
+                if response.status_code < 500:
+                    response.raise_for_status()
+                    data = response.json()
+                    self.pool.release(replica, time.time() - start, success=True)
+                    return data
+                last_error = requests.exceptions.HTTPError(f"{response.status_code} Server Error from {replica.url}", response=response)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                last_error = e
+            except Exception:
+                # Client errors (4xx, bad JSON) are not the replica's fault - do not retry
+                self.pool.release(replica, time.time() - start, success=True)
+                raise
+
+            self.pool.release(replica, time.time() - start, success=False)
+            print(f"[LLM_POOL] {replica.url} failed (attempt {attempt + 1}): {last_error}")
+
+        raise last_error or requests.exceptions.ConnectionError("No LLM replica available")
+
+    def _probe_payload(self) -> dict:
+        """Smallest generation request the backend accepts - used by health probes"""
+        raise NotImplementedError
+
+    def health_check(self, timeout: float = LLM_HEALTH_TIMEOUT) -> bool:
+        """
+        True if any replica completes a one-token generation within timeout
+
+        A hung server still answers metadata endpoints such as /api/tags, so the
+        probe goes through the same generation endpoint as real requests.
+        """
+        payload = self._probe_payload()
+        for replica in self.pool.replicas:
+            try:
+                response = requests.post(replica.url, json=payload, timeout=timeout)
+                if response.ok:
+                    return True
+            except requests.exceptions.RequestException:
+                continue
+        return False
+
+    def get_replica_stats(self) -> list:
+        """Per-replica statistics, empty for backends without endpoints"""
+        return self.pool.get_stats() if self.pool else []
+
+
+class OllamaBackend(LLMBackend):
+    """Ollama /api/generate backend"""
+
+    name = "ollama"
+
+    def __init__(self, urls: list = None, model: str = LLM_MODEL):
+        super().__init__(model, urls or OLLAMA_URLS)
+
+    def generate(self, prompt: str, response_format=None, options: dict = None, timeout: float = LLM_TIMEOUT, prefix: str = None, model: str = None) -> str:
+        payload = {
+            "model": model or self.model,
+            "prompt": prompt,
+            "stream": False,
+            "format": response_format or "json",
+            "keep_alive": LLM_KEEP_ALIVE,
+            "options": dict(DEFAULT_OPTIONS, **(options or {}))
+        }
+
+        # The system prompt is rendered first by the model template, so an identical
+        # prefix lets Ollama reuse the cached KV state instead of re-prefilling it
+        if prefix:
+            payload["system"] = prefix
+
+        data = self._post(payload, timeout)
+        return data.get("response", "").strip()
+
+    def _probe_payload(self) -> dict:
+        return {
+            "model": self.model,
+            "prompt": "ping",
+            "stream": False,
+            "keep_alive": LLM_KEEP_ALIVE,
+            "options": {"num_predict": 1}
+        }
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """OpenAI-compatible /v1/chat/completions backend (llama.cpp server, vLLM, LM Studio)"""
+
+    name = "openai"
+
+    def __init__(self, urls: list = None, model: str = LLM_MODEL):
+        super().__init__(model, urls or OPENAI_COMPAT_URLS)
+
+    def generate(self, prompt: str, response_format=None, options: dict = None, timeout: float = LLM_TIMEOUT, prefix: str = None, model: str = None) -> str:
+        options = dict(DEFAULT_OPTIONS, **(options or {}))
+
+        # llama.cpp accepts a JSON schema inside the json_object response format
+        json_format = {"type": "json_object"}
+        if isinstance(response_format, dict):
+            json_format["schema"] = response_format
+
+        messages = [{"role": "user", "content": prompt}]
+        if prefix:
+            messages.insert(0, {"role": "system", "content": prefix})
+
+        payload = {
+            "model": model or self.model,
+            "messages": messages,
+            "stream": False,
+            "cache_prompt": True,  # llama.cpp: reuse the KV cache for the shared prefix
+            "temperature": options["temperature"],
+            "top_p": options["top_p"],
+            "max_tokens": options["num_predict"],
+            "frequency_penalty": max(0.0, options["repeat_penalty"] - 1.0),
+            "response_format": json_format
+        }
+
+        data = self._post(payload, timeout)
+        choices = data.get("choices") or [{}]
+        return (choices[0].get("message", {}).get("content") or "").strip()
+
+    def _probe_payload(self) -> dict:
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": "ping"}],
+            "stream": False,
+            "max_tokens": 1
+        }
+
+
+class StubBackend(LLMBackend):
+    """Deterministic offline backend - builds slides from the prompt content"""
+
+    name = "stub"
+
+    def __init__(self, model: str = "stub"):
+        super().__init__(model)
+
+    def generate(self, prompt: str, response_format=None, options: dict = None, timeout: float = LLM_TIMEOUT, prefix: str = None, model: str = None) -> str:
+        from llm_client import generate_demo_response
+        return generate_demo_response((prefix or "") + prompt)
+
+    def health_check(self, timeout: float = LLM_HEALTH_TIMEOUT) -> bool:
+        return True
+
+
+BACKENDS = {
+    "ollama": OllamaBackend,
+    "openai": OpenAICompatibleBackend,
+    "stub": StubBackend
+}
+
+
+def create_backend(name: str = None, urls: list = None) -> LLMBackend:
+    """
+    Create the configured backend, falling back to Ollama for unknown names
+
+    Args:
+        name: Backend name (default: config.LLM_BACKEND)
+        urls: Endpoint pool to route across (default: the backend's configured URLs)
+    """
+    name = name or LLM_BACKEND
+    if name not in BACKENDS:
+        print(f"[LLM] Unknown backend '{name}', using ollama")
+        name = "ollama"
+    if name == "stub":
+        return StubBackend()
+    return BACKENDS[name](urls=urls)
@@ -1,54 +1,164 @@
 import requests
 import gc
 import json
+import threading
+import time
+from config import (
+    LLM_MODEL, LLM_FALLBACK,
+    LLM_ROUTES, LLM_SMALL_MODEL_PLANS, LLM_SMALL_DECK_MAX_SLIDES
+)
+from llm_backends import create_backend
+from llm_queue import llm_queue
+from circuit_breaker import CircuitBreaker
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
-MODEL = "qwen2.5:7b-instruct"
+MODEL = LLM_MODEL
 
-def call_llm(prompt: str) -> str:
+# Active backend (Ollama, OpenAI-compatible server or stub) - see config.LLM_BACKEND
+backend = create_backend()
+
+class ModelRouter:
     """
-    Call Ollama LLM - simple and working
+    Pick the model and latency budget for a request by task type, plan and deck size
+
+    Title requests always use the small model; full decks use it for
+    LLM_SMALL_MODEL_PLANS and for decks of at most LLM_SMALL_DECK_MAX_SLIDES slides.
     """
-    payload = {
-        "model": MODEL,
-        "prompt": prompt,
-        "stream": False,
-        "options": {
-            "temperature": 0.7,
-            "top_p": 0.9,
-            "num_ctx": 2048,
-            "num_predict": 1024,
-            "repeat_penalty": 1.1
-        }
-    }
 
-    timeout = 120
-    
-    try:
-        response = requests.post(OLLAMA_URL, json=payload, timeout=timeout)
-        response.raise_for_status()
+    def __init__(self, routes: dict = LLM_ROUTES):
+        self.routes = routes
+        self._lock = threading.Lock()
+        self.stats = {}
 
-        data = response.json()
-        result = data.get("response", "").strip()
-        
-        # Force garbage collection after LLM call
-        gc.collect()
-        
-        return result
-        
+    def route(self, task_type: str = "deck", plan: str = None, slide_count: int = None) -> dict:
+        """Return {'route', 'model', 'latency_budget'} for a request"""
+        if task_type == "title":
+            name = "title"
+        elif plan in LLM_SMALL_MODEL_PLANS or (slide_count and slide_count <= LLM_SMALL_DECK_MAX_SLIDES):
+            name = "deck_small"
+        else:
+            name = "deck"
+
+        route = self.routes.get(name, self.routes["deck"])
+        return {"route": name, "model": route["model"], "latency_budget": route["latency_budget"]}
+
+    def record(self, route: dict, latency: float):
+        """Track per-route latency and requests that used over 80% of their budget"""
+        with self._lock:
+            stats = self.stats.setdefault(route["route"], {
+                "model": route["model"], "requests": 0, "total_latency": 0.0, "near_budget": 0
+            })
+            stats["requests"] += 1
+            stats["total_latency"] += latency
+            if latency > route["latency_budget"] * 0.8:
+                stats["near_budget"] += 1
+                print(f"[LLM_ROUTER] {route['route']} request took {latency:.1f}s of its {route['latency_budget']}s budget")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                name: dict(values, avg_latency=values["total_latency"] / values["requests"])
+                for name, values in self.stats.items()
+            }
+
+
+model_router = ModelRouter()
+
+# Per-thread record of whether the last call_llm was served by the fallback
+_call_state = threading.local()
+
+# Trips on consecutive timeouts/errors so callers stop waiting on a hung backend
+llm_breaker = CircuitBreaker(probe=lambda: backend.health_check(), name="llm")
+
+def call_llm(prompt: str, response_format=None, plan: str = None, prefix: str = None,
+             task_type: str = "deck", slide_count: int = None) -> str:
+    """
+    Call the configured LLM backend through the priority request queue
+
+    While the circuit breaker is open the request skips the backend and goes
+    straight to the configured fallback (see config.LLM_FALLBACK).
+
+    Args:
+        prompt: Prompt text (only the per-request part when prefix is given)
+        response_format: "json" or a JSON schema dict to constrain the output
+                         (default: plain JSON mode)
+        plan: Subscription plan of the requesting user - higher plans are served first
+        prefix: Static instruction block (see extractor.PROMPT_PREFIX) the server
+                can keep in its prompt cache across requests
+        task_type: "deck" or "title" - selects the model route
+        slide_count: Deck size, small decks are routed to the small model
+    """
+    full_prompt = (prefix or "") + prompt
+    _call_state.used_fallback = False
+
+    if not llm_breaker.allow_request():
+        return _fallback(full_prompt, "circuit open")
+
+    try:
+        with llm_queue.slot(plan):
+            # The breaker may have tripped while this request was queued
+            if llm_breaker.allow_request():
+                route = model_router.route(task_type, plan, slide_count)
+                start = time.time()
+                result = backend.generate(prompt, response_format=response_format, prefix=prefix,
+                                          model=route["model"], timeout=route["latency_budget"])
+                model_router.record(route, time.time() - start)
+            else:
+                result = None
     except requests.exceptions.ConnectionError:
-        print("⚠️ Ollama not running - using demo mode")
-        return generate_demo_response(prompt)
+        llm_breaker.record_failure()
+        return _fallback(full_prompt, f"{backend.name} not running")
     except Exception as e:
-        print(f"⚠️ Ollama error: {e} - using demo mode")
-        return generate_demo_response(prompt)
+        # Client errors (4xx, an unparseable body) say nothing about backend health
+        if _is_backend_failure(e):
+            llm_breaker.record_failure()
+        return _fallback(full_prompt, f"{backend.name} error: {e}")
+
+    if result is None:
+        return _fallback(full_prompt, "circuit open")
+
+    llm_breaker.record_success()
+    
+    # Force garbage collection after LLM call
+    gc.collect()
+    
+    return result
+
+def _is_backend_failure(error: Exception) -> bool:
+    """Timeouts, connection errors and 5xx responses count against the circuit breaker"""
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    response = getattr(error, "response", None)
+    return isinstance(error, requests.exceptions.HTTPError) and response is not None and response.status_code >= 500
+
+def _fallback(prompt: str, reason: str) -> str:
+    """Serve the configured fallback instead of a backend response"""
+    _call_state.used_fallback = True
+    if LLM_FALLBACK == 'error':
+        raise RuntimeError(f"LLM unavailable ({reason})")
+    print(f"⚠️ {reason} - using demo mode")
+    return generate_demo_response(prompt)
+
+def last_call_used_fallback() -> bool:
+    """True if the most recent call_llm on this thread returned fallback output"""
+    return getattr(_call_state, "used_fallback", False)
+
+def get_llm_stats() -> dict:
+    """LLM backend and queue metrics"""
+    return {
+        "backend": backend.name,
+        "model": backend.model,
+        "replicas": backend.get_replica_stats(),
+        "breaker": llm_breaker.get_stats(),
+        "routes": model_router.get_stats(),
+        "queue": llm_queue.get_stats()
+    }
 
 def generate_demo_response(prompt: str) -> str:
     """Generate RICH demo response using extracted content from prompt"""
     import re
     
     # Extract slide count from prompt
-    slide_match = re.search(r'(\d+)\s*slides?', prompt.lower())
+    slide_match = re.search(r'SLIDES REQUIRED:\s*(\d+)', prompt) or re.search(r'(\d+)\s*slides?', prompt.lower())
     slide_count = int(slide_match.group(1)) if slide_match else 5
     
     # Extract topic from TASK line in prompt
@@ -58,7 +168,7 @@ def generate_demo_response(prompt: str) -> str:
         topic = task_match.group(1).strip()
     
     # Extract content from prompt for rich information
-    content_match = re.search(r'CONTENT TO USE:\s*(.*?)(?=CRITICAL REQUIREMENTS|$)', prompt, re.DOTALL)
+    content_match = re.search(r'CONTENT TO USE:\s*(.*?)(?=TASK:|CRITICAL REQUIREMENTS|$)', prompt, re.DOTALL)
     extracted_content = content_match.group(1).strip() if content_match else ""
     
     # Parse content into meaningful sections
@@ -0,0 +1,101 @@
+# llm_pool.py
+# Endpoint pool for LLM replicas - least-outstanding-requests routing with health-aware ejection
+
+import threading
+import time
+from typing import Dict, List, Optional
+from config import LLM_REPLICA_EJECT_AFTER, LLM_REPLICA_EJECT_SECONDS
+
+
+class Replica:
+    """One LLM server endpoint and its running statistics"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.total_latency = 0.0
+        self.ewma_latency = 0.0
+        self.ejected_until = 0.0
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def to_dict(self, now: float) -> Dict:
+        return {
+            "url": self.url,
+            "healthy": self.is_healthy(now),
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors,
+            "consecutive_errors": self.consecutive_errors,
+            "avg_latency": self.total_latency / self.requests if self.requests else 0.0,
+            "ewma_latency": self.ewma_latency,
+            "ejected_for": max(0.0, self.ejected_until - now)
+        }
+
+
+class EndpointPool:
+    """
+    Route requests across replicas
+
+    Picks the healthy replica with the fewest outstanding requests (ties broken
+    by recent failures, then latency). A replica that fails LLM_REPLICA_EJECT_AFTER
+    times in a row is skipped for LLM_REPLICA_EJECT_SECONDS; if every replica is
+    ejected the one due back soonest is still tried rather than failing outright.
+    """
+
+    def __init__(self, urls: List[str], eject_after: int = LLM_REPLICA_EJECT_AFTER,
+                 eject_seconds: float = LLM_REPLICA_EJECT_SECONDS):
+        if not urls:
+            raise ValueError("Endpoint pool needs at least one URL")
+        self.replicas = [Replica(url) for url in urls]
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.replicas)
+
+    def acquire(self, exclude=()) -> Optional[Replica]:
+        """Reserve a replica for one request, skipping URLs in exclude"""
+        now = time.time()
+        with self._lock:
+            candidates = [replica for replica in self.replicas if replica.url not in exclude]
+            if not candidates:
+                return None
+
+            healthy = [replica for replica in candidates if replica.is_healthy(now)]
+            if healthy:
+                replica = min(healthy, key=lambda r: (r.outstanding, r.consecutive_errors, r.ewma_latency))
+            else:
+                replica = min(candidates, key=lambda r: r.ejected_until)
+
+            replica.outstanding += 1
+            return replica
+
+    def release(self, replica: Replica, latency: float, success: bool):
+        """Return a replica and record the outcome of its request"""
+        with self._lock:
+            replica.outstanding = max(0, replica.outstanding - 1)
+            replica.requests += 1
+            replica.total_latency += latency
+            replica.ewma_latency = latency if replica.requests == 1 else 0.8 * replica.ewma_latency + 0.2 * latency
+
+            if success:
+                replica.consecutive_errors = 0
+                replica.ejected_until = 0.0
+            else:
+                replica.errors += 1
+                replica.consecutive_errors += 1
+                if replica.consecutive_errors >= self.eject_after:
+                    replica.ejected_until = time.time() + self.eject_seconds
+                    print(f"[LLM_POOL] Ejecting {replica.url} for {self.eject_seconds}s after {replica.consecutive_errors} consecutive failures")
+
+    def get_stats(self) -> List[Dict]:
+        """Per-replica latency and error statistics"""
+        now = time.time()
+        with self._lock:
+            return [replica.to_dict(now) for replica in self.replicas]
@@ -0,0 +1,108 @@
+# llm_queue.py
+# Client-side priority queue that limits in-flight LLM requests
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+from config import LLM_MAX_IN_FLIGHT, LLM_PLAN_PRIORITY
+
+
+class LLMRequestQueue:
+    """
+    Admit at most max_in_flight LLM requests at a time, serving higher plans first
+
+    Requests with the same priority are served in arrival order.
+    """
+
+    def __init__(self, max_in_flight: int = LLM_MAX_IN_FLIGHT):
+        self.max_in_flight = max(1, max_in_flight)
+        self._condition = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+
+        self.stats = {
+            "requests": 0,
+            "total_wait_time": 0.0,
+            "max_wait_time": 0.0,
+            "last_wait_time": 0.0,
+            "wait_by_plan": {}
+        }
+
+    def _priority(self, plan: str) -> int:
+        """Priority for a plan - unknown plans queue behind every known plan"""
+        return LLM_PLAN_PRIORITY.get(plan, max(LLM_PLAN_PRIORITY.values()) + 1)
+
+    def acquire(self, plan: str = None) -> float:
+        """Block until this request may run; returns the time spent waiting"""
+        ticket = (self._priority(plan), next(self._sequence))
+        start = time.time()
+
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+            while self._in_flight >= self.max_in_flight or self._waiting[0] != ticket:
+                self._condition.wait()
+
+            heapq.heappop(self._waiting)
+            self._in_flight += 1
+
+            wait_time = time.time() - start
+            self._record_wait(plan, wait_time)
+
+            # The next ticket may also fit if more than one slot is free
+            self._condition.notify_all()
+
+        if wait_time > 1:
+            print(f"[LLM_QUEUE] {plan or 'unknown'} request waited {wait_time:.1f}s for a slot")
+        return wait_time
+
+    def release(self):
+        """Free a slot for the next queued request"""
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, plan: str = None):
+        """Context manager around acquire/release"""
+        wait_time = self.acquire(plan)
+        try:
+            yield wait_time
+        finally:
+            self.release()
+
+    def _record_wait(self, plan: str, wait_time: float):
+        """Update wait-time metrics (caller holds the lock)"""
+        self.stats["requests"] += 1
+        self.stats["total_wait_time"] += wait_time
+        self.stats["last_wait_time"] = wait_time
+        self.stats["max_wait_time"] = max(self.stats["max_wait_time"], wait_time)
+
+        plan_stats = self.stats["wait_by_plan"].setdefault(plan or "unknown", {"requests": 0, "total_wait_time": 0.0})
+        plan_stats["requests"] += 1
+        plan_stats["total_wait_time"] += wait_time
+
+    def get_stats(self) -> Dict:
+        """Queue depth and wait-time metrics"""
+        with self._condition:
+            requests_served = self.stats["requests"]
+            return {
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiting),
+                "requests": requests_served,
+                "avg_wait_time": self.stats["total_wait_time"] / requests_served if requests_served else 0.0,
+                "max_wait_time": self.stats["max_wait_time"],
+                "last_wait_time": self.stats["last_wait_time"],
+                "avg_wait_by_plan": {
+                    plan: values["total_wait_time"] / values["requests"]
+                    for plan, values in self.stats["wait_by_plan"].items()
+                }
+            }
+
+
+# Global instance
+llm_queue = LLMRequestQueue()
@@ -0,0 +1,98 @@
+# package_writer.py
+# Package (.pptx zip) writer that stores already-compressed media and deflates XML at a set level
+
+import time
+import threading
+import zipfile
+from typing import Dict
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from pptx.opc.serialized import _ContentTypesItem
+from config import PACKAGE_XML_COMPRESSLEVEL, PACKAGE_STORE_MEDIA
+
+# Content types whose payload is already compressed - deflating them again costs CPU for ~0 bytes
+PRECOMPRESSED_CONTENT_TYPES = {
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "video/mp4",
+    "audio/mpeg",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+}
+
+
+class PackageWriter:
+    """
+    Drop-in replacement for Presentation.save
+
+    Writes the same members as python-pptx's PackageWriter, in the same order
+    ([Content_Types].xml, package rels, then each part followed by its rels), but
+    picks the compression per member: PRECOMPRESSED_CONTENT_TYPES are stored with
+    ZIP_STORED and XML is deflated at PACKAGE_XML_COMPRESSLEVEL. Each member is
+    serialized and written in turn, so output may be a path or any writable
+    stream, including an unseekable one such as an HTTP response.
+    """
+
+    def __init__(self, xml_compresslevel: int = PACKAGE_XML_COMPRESSLEVEL, store_media: bool = PACKAGE_STORE_MEDIA):
+        self.xml_compresslevel = xml_compresslevel
+        self.store_media = store_media
+        self._lock = threading.Lock()
+        self.stats = {
+            "saves": 0,
+            "stored_bytes": 0,
+            "deflated_bytes": 0,
+            "total_save_time": 0.0
+        }
+
+    def save(self, prs, output):
+        """Write prs to output (a path or a binary file-like object)"""
+        start_time = time.time()
+        package = prs.part.package
+        parts = tuple(package.iter_parts())
+        stored_bytes = deflated_bytes = 0
+
+        with self.open_zip(output) as zip_file:
+            zip_file.writestr(CONTENT_TYPES_URI.lstrip("/"), serialize_part_xml(_ContentTypesItem.xml_for(parts)))
+            zip_file.writestr(PACKAGE_URI.rels_uri.membername, package._rels.xml)
+
+            for part in parts:
+                blob = part.blob
+                if self.write_member(zip_file, part.partname.membername, blob, part.content_type):
+                    stored_bytes += len(blob)
+                else:
+                    deflated_bytes += len(blob)
+
+                if part._rels:
+                    zip_file.writestr(part.partname.rels_uri.membername, part.rels.xml)
+
+        elapsed = time.time() - start_time
+        self.record_save(stored_bytes, deflated_bytes, elapsed)
+        print(f"[PACKAGE] Saved {len(parts)} parts in {elapsed:.2f}s "
+              f"({stored_bytes / 1024:.0f}KB stored, {deflated_bytes / 1024:.0f}KB deflated)")
+
+    def open_zip(self, output) -> zipfile.ZipFile:
+        """Zip file for a package, deflating at PACKAGE_XML_COMPRESSLEVEL by default"""
+        return zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=self.xml_compresslevel)
+
+    def write_member(self, zip_file: zipfile.ZipFile, membername: str, blob: bytes, content_type: str = None) -> bool:
+        """Write one member, stored uncompressed if content_type is already compressed; True if stored"""
+        if self.store_media and content_type in PRECOMPRESSED_CONTENT_TYPES:
+            zip_file.writestr(membername, blob, compress_type=zipfile.ZIP_STORED)
+            return True
+        zip_file.writestr(membername, blob)
+        return False
+
+    def record_save(self, stored_bytes: int, deflated_bytes: int, elapsed: float):
+        with self._lock:
+            self.stats["saves"] += 1
+            self.stats["stored_bytes"] += stored_bytes
+            self.stats["deflated_bytes"] += deflated_bytes
+            self.stats["total_save_time"] += elapsed
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, xml_compresslevel=self.xml_compresslevel, store_media=self.store_media)
+
+
+# Global instance
+package_writer = PackageWriter()
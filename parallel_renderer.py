@@ -0,0 +1,192 @@
+# parallel_renderer.py
+# Render slides across a process pool and merge the results into one package
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Tuple
+from slide_transfer import export_slide, append_slide
+from config import RENDER_WORKERS
+
+# Chunks per worker - more, smaller chunks even out slides with slow visuals
+CHUNKS_PER_WORKER = 2
+
+# Set by the pool initializer - a render worker never starts a pool of its own
+_in_worker = False
+
+
+class ParallelRenderer:
+    """
+    Partition a deck across worker processes, then merge the rendered slides
+
+    Each worker renders its chunk into its own copy of the base presentation
+    and returns every slide as plain data (see slide_transfer.export_slide).
+    The merge appends the slides to the real deck in order; images are related
+    through the package so identical media is stored once, any other related
+    parts are copied under fresh partnames and rIds in the XML are rewritten.
+    """
+
+    def __init__(self, workers: int = RENDER_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self.stats = {"decks": 0, "slides": 0, "visuals": 0, "pool_failures": 0, "total_render_time": 0.0}
+
+    @property
+    def available(self) -> bool:
+        """Whether work can be spread across the pool from this process"""
+        return self.workers >= 2 and not _in_worker
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if _in_worker:
+            raise RuntimeError("Render workers cannot start a nested render pool")
+        with self._lock:
+            if self._executor is None:
+                # spawn: never fork a process that has LLM, queue and breaker threads running
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_worker
+                )
+            return self._executor
+
+    def render(self, slides: List[Dict], design_style: str, visual_preferences: Dict, visuals: Dict = None) -> List[Dict]:
+        """
+        Render all slides in the pool and return their payloads in slide order
+
+        visuals are the deck's pre-fetched visuals by slide index (see
+        ppt_generator._prefetch_images); each chunk gets its own slides' share.
+        """
+        visuals = visuals or {}
+        start_time = time.time()
+        slide_count = len(slides)
+        chunk_size = max(1, -(-slide_count // (self.workers * CHUNKS_PER_WORKER)))
+        tasks = [
+            (start, slides[start:start + chunk_size], slide_count, design_style, visual_preferences,
+             {i: visuals[i] for i in range(start, start + chunk_size) if i in visuals})
+            for start in range(0, slide_count, chunk_size)
+        ]
+        print(f"[PARALLEL] Rendering {slide_count} slides in {len(tasks)} chunks on {self.workers} processes")
+
+        executor = self._get_executor()
+        try:
+            chunks = list(executor.map(_render_chunk, tasks))
+        except BrokenProcessPool:
+            # Recreate the pool on the next deck
+            with self._lock:
+                self._executor = None
+            self.stats["pool_failures"] += 1
+            raise
+
+        elapsed = time.time() - start_time
+        self.stats["decks"] += 1
+        self.stats["slides"] += slide_count
+        self.stats["total_render_time"] += elapsed
+        print(f"[PARALLEL] Rendered {slide_count} slides in {elapsed:.2f}s")
+        return [payload for chunk in chunks for payload in chunk]
+
+    def render_decks(self, decks: List[Tuple]) -> List[Dict]:
+        """
+        Render whole decks in the pool, one deck per task
+
+        Each deck is (slides, output_path, design_style, visual_preferences);
+        returns {"output", "error"} per deck in the same order.
+        """
+        start_time = time.time()
+        print(f"[PARALLEL] Rendering {len(decks)} decks on {self.workers} processes")
+
+        executor = self._get_executor()
+        try:
+            results = list(executor.map(_render_deck, decks))
+        except BrokenProcessPool:
+            with self._lock:
+                self._executor = None
+            self.stats["pool_failures"] += 1
+            raise
+
+        print(f"[PARALLEL] Rendered {len(decks)} decks in {time.time() - start_time:.2f}s")
+        return results
+
+    def render_visuals(self, visuals: List[Tuple]) -> List[bytes]:
+        """
+        Rasterize matplotlib charts and tables in the pool, one visual per task
+
+        Each visual is (visual_type, data) as taken by chart_service.render_image;
+        returns the PNG bytes (None where rendering failed) in the same order.
+        """
+        start_time = time.time()
+        executor = self._get_executor()
+        try:
+            images = list(executor.map(_render_visual, visuals))
+        except BrokenProcessPool:
+            with self._lock:
+                self._executor = None
+            self.stats["pool_failures"] += 1
+            raise
+
+        self.stats["visuals"] += len(visuals)
+        print(f"[PARALLEL] Rendered {len(visuals)} visuals on {self.workers} processes in {time.time() - start_time:.2f}s")
+        return images
+
+    def merge(self, prs, payloads: List[Dict]):
+        """Append the rendered slides to prs"""
+        for payload in payloads:
+            append_slide(prs, payload)
+
+    def get_stats(self) -> Dict:
+        return dict(self.stats, workers=self.workers)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+def _warm_worker():
+    """Process pool initializer - parse the base template and import matplotlib before the first task"""
+    global _in_worker
+    _in_worker = True
+    from presentation_pool import presentation_pool
+    import chart_service
+    presentation_pool.warm()
+
+
+def _render_chunk(task) -> List[Dict]:
+    """Worker: render a run of slides into a private deck and return them as payloads"""
+    from ppt_generator import _render_slide
+    from presentation_pool import presentation_pool
+    from design_styles import get_design_style
+
+    start, chunk, slide_count, design_style, visual_preferences, visuals = task
+
+    prs = presentation_pool.new_presentation()
+    prs._design_style = design_style
+    prs._total_slides = slide_count
+    prs._visuals = visuals
+    style_config = get_design_style(design_style) or get_design_style("minimal_1")
+
+    payloads = []
+    for offset, slide_data in enumerate(chunk):
+        slide = _render_slide(prs, slide_data, start + offset, slide_count, design_style, style_config, visual_preferences)
+        payloads.append(export_slide(prs, slide))
+    return payloads
+
+
+def _render_visual(task) -> bytes:
+    """Worker: rasterize one chart or table"""
+    from chart_service import chart_service
+    visual_type, data = task
+    return chart_service.render_image(visual_type, data)
+
+
+def _render_deck(task) -> Dict:
+    """Worker: render one complete deck to its output path"""
+    from ppt_generator import _generate_variant
+    return _generate_variant(task)
+
+
+# Global instance
+parallel_renderer = ParallelRenderer()
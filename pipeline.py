@@ -2,19 +2,108 @@ import json
 import os
 import gc
 import sys
-from extractor import extract_main, build_prompt
-from llm_client import call_llm
+from extractor import extract_main, build_prompt_parts, build_continuation_prompt
+from llm_client import call_llm, last_call_used_fallback, model_router
+from prompt_cache import prompt_cache
+from config import PROMPT_CACHE_ENABLED, MAX_DECK_SLIDES
+from slide_parser import parse_slides, SLIDES_SCHEMA
 from ppt_generator import generate_ppt  # Use the beautiful system
 from performance_monitor import start_monitoring, checkpoint, finish_monitoring, get_memory_stats, trigger_cleanup
-from job_store import get_job_stats
+from job_store import get_job_stats, save_job_artifacts
+from slide_model import SlideRecord
 
 OUTPUT_DIR = "outputs"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Maximum follow-up LLM calls used to fill in slides missing from a truncated response
+MAX_CONTINUATION_ROUNDS = 2
 
-def run_pipeline(url: str, task: str, design_style: str, visual_preferences: dict, slide_count: int = 10) -> str:
+
+def _generate_slides(content: str, task: str, slide_count: int, plan: str = None) -> tuple:
+    """
+    Generate slides with the LLM, completing a truncated response
+
+    Returns (slides, cacheable) - cacheable is False if any call fell back to demo output
+    """
+    prompt_prefix, prompt = build_prompt_parts(content, task, slide_count)
+    raw = call_llm(prompt, response_format=SLIDES_SCHEMA, plan=plan, prefix=prompt_prefix, slide_count=slide_count)
+    cacheable = not last_call_used_fallback()
+
+    # Clear prompt from memory
+    prompt = None
+    gc.collect()
+
+    # Repair and validate in one pass - a malformed response no longer fails the job
+    slides = parse_slides(raw)["slides"]
+
+    # Clear raw response from memory
+    raw = None
+    gc.collect()
+
+    # Keep every complete slide and only ask the LLM for the ones that are missing
+    slides, complete_cacheable = _complete_missing_slides(slides, content, task, slide_count, plan)
+
+    return slides, cacheable and complete_cacheable
+
+
+def _complete_missing_slides(slides: list, content: str, task: str, slide_count: int, plan: str = None) -> tuple:
+    """
+    Request only the slides missing from a truncated LLM response and merge them in
+
+    Returns (slides, cacheable) - cacheable is False if a continuation fell back to demo
+    output or failed, so a short deck is never cached
+    """
+    cacheable = True
+    for round_number in range(1, MAX_CONTINUATION_ROUNDS + 1):
+        missing_count = slide_count - len(slides)
+        if missing_count <= 0:
+            break
+
+        print(f"[3.{round_number}] Response has {len(slides)}/{slide_count} slides - requesting {missing_count} missing slides...")
+        existing_titles = [slide["title"] for slide in slides]
+        prompt = build_continuation_prompt(content, task, existing_titles, missing_count, slide_count)
+
+        try:
+            continuation = parse_slides(call_llm(prompt, response_format=SLIDES_SCHEMA, plan=plan, slide_count=slide_count))
+            cacheable = cacheable and not last_call_used_fallback()
+        except ValueError as e:
+            print(f"[CONTINUATION] Could not parse continuation: {e}")
+            cacheable = False
+            break
+        except RuntimeError as e:
+            # LLM_FALLBACK=error - keep the slides we already have
+            print(f"[CONTINUATION] LLM unavailable: {e}")
+            cacheable = False
+            break
+
+        # Merge only new content slides; the deck already has its title slide
+        seen_titles = {title.lower() for title in existing_titles}
+        added = 0
+        for slide in continuation["slides"]:
+            if slide["slide_type"] == "title" or slide["title"].lower() in seen_titles:
+                continue
+            slides.append(slide)
+            seen_titles.add(slide["title"].lower())
+            added += 1
+            if len(slides) >= slide_count:
+                break
+
+        print(f"[CONTINUATION] Added {added} slides ({len(slides)}/{slide_count})")
+        if added == 0:
+            break
+
+    return slides, cacheable
+
+
+def run_pipeline(url: str, task: str, design_style: str, visual_preferences: dict, slide_count: int = 10,
+                 plan: str = None, use_cache: bool = True, job_id: str = None) -> str:
     """
     Run the complete PPT generation pipeline with robust error handling and memory management
+
+    use_cache=False skips the near-duplicate prompt cache and always calls the LLM.
+    With a job_id, the extracted content, final slides (as SlideRecords) and design
+    are saved on the job so the deck can be edited or restyled later without
+    extracting or calling the LLM again.
     """
     output_path = None
     
@@ -34,68 +123,38 @@ def run_pipeline(url: str, task: str, design_style: str, visual_preferences: dic
             raise ValueError("Could not extract sufficient content from URL. Please provide a URL with substantial content.")
         
         print(f"[1] Extracted {len(content)} characters from URL")
+        if job_id:
+            save_job_artifacts(job_id, content=content)
 
-        print("[2] Building prompt...")
-        prompt = build_prompt(content, task, slide_count)
-        
-        # Clear content from memory after prompt building
-        content = None
-        gc.collect()
-
-        print("[3] Calling LLM...")
-        raw = call_llm(prompt)
-        
-        # Clear prompt from memory
-        prompt = None
-        gc.collect()
+        use_cache = use_cache and PROMPT_CACHE_ENABLED
+        # Cached slides are only reused for requests that would go to the same model
+        model = model_router.route("deck", plan, slide_count)["model"]
+        slides = prompt_cache.lookup(task, content, slide_count, model) if use_cache else None
 
-        if not raw:
-            raise ValueError("LLM returned empty response")
-
-        # Remove accidental markdown
-        raw = raw.strip()
-        if raw.startswith("```"):
-            raw = raw.strip("`").replace("json", "").strip()
+        if slides:
+            print("[2] Reusing LLM output from a near-identical request")
+        else:
+            print("[2] Building prompt...")
+            print("[3] Calling LLM...")
+            slides, cacheable = _generate_slides(content, task, slide_count, plan)
+            # A deck still short after the continuation rounds is not worth reusing
+            if use_cache and cacheable and len(slides) >= slide_count:
+                prompt_cache.store(task, content, slide_count, slides, model)
 
-        try:
-            data = json.loads(raw)
-        except json.JSONDecodeError as e:
-            print(f"\n[ERROR] JSON Parse Error: {e}")
-            print(f"[DEBUG] RAW LLM OUTPUT (first 500 chars):\n{raw[:500]}...")
-            raise ValueError(f"LLM did not return valid JSON: {e}")
-
-        # Clear raw response from memory
-        raw = None
+        # Clear content from memory once no more prompts need it
+        content = None
         gc.collect()
 
-        if "slides" not in data:
-            raise ValueError("JSON missing 'slides' key")
-
-        # CRITICAL FIX: Intelligent slide limiting based on system resources
-        slides = data["slides"]
+        # Large decks are streamed to disk slide by slide (see STREAMING_WRITER_MIN_SLIDES),
+        # so memory no longer limits the slide count - only MAX_DECK_SLIDES does
         original_count = len(slides)
-        
-        # Memory-based slide limiting
-        memory_stats = get_memory_stats()
-        current_memory = memory_stats.get('current_mb', 0)
-        
-        if current_memory > 300:  # High memory usage already
-            max_slides = 15
-        elif current_memory > 200:
-            max_slides = 20
-        else:
-            max_slides = 25
-        
-        if original_count > max_slides:
-            print(f"[OPTIMIZATION] Limiting slides from {original_count} to {max_slides} for stability (current memory: {current_memory:.1f}MB)")
-            slides = slides[:max_slides]
-        elif original_count > 30:
-            print(f"[SAFETY] Hard limit: Truncating from {original_count} to 30 slides")
-            slides = slides[:30]
-
-        # Clear original data to save memory
-        data = None
-        gc.collect()
+        if original_count > MAX_DECK_SLIDES:
+            print(f"[SAFETY] Hard limit: Truncating from {original_count} to {MAX_DECK_SLIDES} slides")
+            slides = slides[:MAX_DECK_SLIDES]
+
+        if job_id:
+            save_job_artifacts(job_id, slides=[SlideRecord.from_dict(slide) for slide in slides],
+                               design_style=design_style, visual_preferences=dict(visual_preferences))
 
         # Start performance monitoring
         slide_count = len(slides)
@@ -135,6 +194,8 @@ def run_pipeline(url: str, task: str, design_style: str, visual_preferences: dic
                 design_style="minimal_1",  # Use beautiful default
                 visual_preferences=minimal_prefs
             )
+            if job_id:
+                save_job_artifacts(job_id, design_style="minimal_1", visual_preferences=minimal_prefs)
             print("[RECOVERY] Successfully generated beautiful PPT with minimal settings")
 
         # Clear slides from memory
@@ -5,15 +5,28 @@ from pptx.enum.shapes import MSO_SHAPE
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
 from pptx.dml.color import RGBColor
 from pptx.enum.dml import MSO_THEME_COLOR
-from design_enforcer import enforce_design
+from design_enforcer import enforce_design, enforce_text_contrast
 from theme_engine import hex_to_rgb
 from slide_mapper import get_slide_layout
 from design_styles import get_design_style, apply_design_decorations
 from visual_elements import add_visual_elements_to_slide
+from slide_model import SlideRecord
+from slide_writer import slide_writer
+from presentation_pool import presentation_pool
+from package_writer import package_writer
+from parallel_renderer import parallel_renderer
+from slide_transfer import export_slide, replace_slide
+from streaming_writer import StreamingDeckWriter
 from performance_monitor import checkpoint
+from beautiful_simple_system import beautiful_system
+from config import (
+    PARALLEL_RENDER_ENABLED, PARALLEL_RENDER_MIN_SLIDES, STREAMING_WRITER_MIN_SLIDES,
+    VISUAL_PRERENDER_ENABLED, VISUAL_PRERENDER_MIN_VISUALS, CHART_ENGINE, TABLE_ENGINE, IMAGE_PREFETCH_WORKERS
+)
+from concurrent.futures.process import BrokenProcessPool
 import gc
 import re
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 SLIDE_LAYOUTS = {
     "title": 0,
@@ -29,7 +42,8 @@ PERFECT_FONTS = {
     "bullet": {"name": "Segoe UI", "size": 16, "bold": False}
 }
 
-def generate_ppt(slides: list, output_path: str, design_style: str = "minimal_1", visual_preferences: dict = None):
+def generate_ppt(slides: list, output_path: str, design_style: str = "minimal_1", visual_preferences: dict = None,
+                 parallel: Optional[bool] = None, streaming: Optional[bool] = None):
     """
     Generate PERFECT PPT with premium design, flawless formatting, and zero errors
     
@@ -38,8 +52,13 @@ def generate_ppt(slides: list, output_path: str, design_style: str = "minimal_1"
         output_path: Path to save the PPT file
         design_style: Design style ID to use (e.g., "minimal_1", "corporate_1", "tech_1", etc.)
         visual_preferences: Dict of visual element preferences
+        parallel: Render slides across the worker process pool (None = decide from PARALLEL_RENDER_* config)
+        streaming: Write each slide to output_path as soon as it is rendered, keeping memory
+                   flat for very large decks (None = decide from STREAMING_WRITER_MIN_SLIDES)
     """
     prs = None
+    writer = None
+    visuals = {}
     try:
         # Input validation with detailed error messages
         if not isinstance(slides, list):
@@ -48,6 +67,10 @@ def generate_ppt(slides: list, output_path: str, design_style: str = "minimal_1"
         if not slides:
             raise ValueError("At least one slide is required")
         
+        for slide_index, slide_data in enumerate(slides):
+            if not isinstance(slide_data, dict):
+                raise ValueError(f"Slide {slide_index + 1} must be a dictionary")
+        
         if visual_preferences is None:
             visual_preferences = {
                 "graphs": False,
@@ -61,16 +84,12 @@ def generate_ppt(slides: list, output_path: str, design_style: str = "minimal_1"
         # Intelligent memory optimization based on slide count
         memory_budget_per_slide = _calculate_memory_budget(slide_count, visual_preferences)
         
-        # Create presentation with perfect settings
-        prs = Presentation()
+        # Copy of the warm, pre-parsed 16:9 template (no per-deck template parsing)
+        prs = presentation_pool.new_presentation()
         
         # Store design style and slide count for visual elements
         prs._design_style = design_style
         prs._total_slides = slide_count
-        
-        # Set to perfect 16:9 widescreen ratio for modern displays
-        prs.slide_width = Inches(13.333)  # Perfect widescreen width
-        prs.slide_height = Inches(7.5)    # Perfect widescreen height
 
         # Get design style configuration with fallback protection
         style_config = get_design_style(design_style)
@@ -82,68 +101,79 @@ def generate_ppt(slides: list, output_path: str, design_style: str = "minimal_1"
         
         # Track memory for optimization
         initial_memory = _get_memory_usage()
-        
-        for slide_index, slide_data in enumerate(slides):
-            # Validate slide data structure
-            if not isinstance(slide_data, dict):
-                raise ValueError(f"Slide {slide_index + 1} must be a dictionary")
 
-            # Memory monitoring and optimization
-            current_memory = _get_memory_usage()
-            if slide_index > 0:
-                memory_per_slide = (current_memory - initial_memory) / slide_index
-                if memory_per_slide > memory_budget_per_slide:
-                    print(f"[OPTIMIZE] Memory usage {memory_per_slide:.1f}MB/slide, optimizing...")
+        # Ensure output directory exists
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+        render_prs = prs
+        if _use_streaming_writer(slide_count, streaming):
+            # Render each slide into a scratch deck and stream it out; prs only collects the slide list
+            print(f"[STREAM] Streaming {slide_count} slides to {output_path}")
+            writer = StreamingDeckWriter(prs, output_path)
+            render_prs = presentation_pool.new_presentation()
+            render_prs._design_style = design_style
+            render_prs._total_slides = slide_count
+
+        # Search and download the slides' images concurrently while the slides render. A streamed
+        # deck only keeps a window of upcoming images in flight, so its memory stays flat
+        image_slides = _image_slides(slides)
+        _prefetch_images(image_slides, visuals, IMAGE_PREFETCH_WORKERS if writer is not None else None)
+
+        payloads = None
+        if writer is None and _use_parallel_render(slide_count, parallel):
+            try:
+                # Worker processes need the image bytes up front
+                for visual in visuals.values():
+                    visual['image'] = visual['image'].result()
+                payloads = parallel_renderer.render(slides, design_style, visual_preferences, visuals)
+            except (BrokenProcessPool, OSError) as e:
+                print(f"[PARALLEL] Render pool unavailable ({e}), rendering in-process")
+
+        if payloads is not None:
+            # Assemble the slides rendered by the worker processes into this deck
+            parallel_renderer.merge(prs, payloads)
+        else:
+            # Rasterize the deck's charts and tables across the pool before the slide loop
+            visuals.update(_prerender_visuals(slides, design_style))
+            render_prs._visuals = visuals
+
+            for slide_index, slide_data in enumerate(slides):
+                # Memory monitoring and optimization
+                current_memory = _get_memory_usage()
+                if slide_index > 0:
+                    memory_per_slide = (current_memory - initial_memory) / slide_index
+                    if memory_per_slide > memory_budget_per_slide:
+                        print(f"[OPTIMIZE] Memory usage {memory_per_slide:.1f}MB/slide, optimizing...")
+                        _aggressive_cleanup()
+                
+                # Progress tracking with beautiful output
+                if slide_index % 3 == 0 and slide_index > 0:
+                    progress = (slide_index / slide_count) * 100
+                    print(f"[PROGRESS] {progress:.0f}% complete - {slide_index}/{slide_count} slides")
+                    checkpoint(slide_index, "slide_batch_complete")
+
+                slide = _render_slide(render_prs, slide_data, slide_index, slide_count, design_style, style_config,
+                                      visual_preferences)
+                if writer is not None:
+                    writer.write_slide(render_prs, slide)
+
+                    # The slide is on disk - drop its visual (if it was not used) and refill the image window
+                    if slide_index in visuals:
+                        _release_visuals({slide_index: visuals.pop(slide_index)})
+                    _prefetch_images(image_slides, visuals, IMAGE_PREFETCH_WORKERS)
+                
+                # Memory cleanup every 5 slides
+                if slide_index % 5 == 4:
                     _aggressive_cleanup()
-            
-            # Progress tracking with beautiful output
-            if slide_index % 3 == 0 and slide_index > 0:
-                progress = (slide_index / slide_count) * 100
-                print(f"[PROGRESS] {progress:.0f}% complete - {slide_index}/{slide_count} slides")
-                checkpoint(slide_index, "slide_batch_complete")
-
-            # Extract and validate slide content
-            slide_type = slide_data.get("slide_type", "content")
-            title = _clean_text(slide_data.get("title", ""))
-            bullets = slide_data.get("bullets", [])
-
-            # Validate slide type
-            if slide_type not in SLIDE_LAYOUTS:
-                print(f"[WARNING] Unknown slide type '{slide_type}', using 'content'")
-                slide_type = "content"
-
-            # Create slide with proper layout
-            slide = prs.slides.add_slide(prs.slide_layouts[SLIDE_LAYOUTS[slide_type]])
-
-            # Apply perfect background design
-            _apply_perfect_background(slide, style_config)
-
-            # BEAUTIFUL SIMPLE SYSTEM - handles all content and visual placement
-            print(f"[BEAUTIFUL] Creating beautiful, uncluttered layout for slide {slide_index + 1}")
-            
-            # Add beautiful visual elements using the simple system
-            add_visual_elements_to_slide(slide, slide_data, design_style, visual_preferences, prs, slide_index)
-            
-            # Apply perfect design decorations (minimal for clean look)
-            if slide_count <= 15:  # Only for manageable presentations
-                apply_design_decorations(slide, design_style, prs)
-            
-            # Enforce perfect design rules
-            layout_info = get_slide_layout(slide_type)
-            enforce_design(slide, layout_info)
-            
-            # Memory cleanup every 5 slides
-            if slide_index % 5 == 4:
-                _aggressive_cleanup()
 
         # Save with perfect error handling
         print(f"[PERFECT] Finalizing presentation...")
         checkpoint(slide_count, "ppt_complete")
-        
-        # Ensure output directory exists
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        prs.save(output_path)
+
+        if writer is not None:
+            writer.close()
+        else:
+            package_writer.save(prs, output_path)
         
         final_memory = _get_memory_usage()
         print(f"[SUCCESS] Perfect presentation created!")
@@ -159,6 +189,12 @@ def generate_ppt(slides: list, output_path: str, design_style: str = "minimal_1"
         raise
         
     finally:
+        # Close the zip of a streamed deck that did not finish
+        if writer is not None:
+            writer.abort()
+
+        _release_visuals(visuals)
+
         # Perfect cleanup
         if prs:
             try:
@@ -174,6 +210,217 @@ def generate_ppt(slides: list, output_path: str, design_style: str = "minimal_1"
         print(f"[CLEANUP] Memory after cleanup: {_get_memory_usage():.1f}MB")
 
 
+def generate_ppt_variants(slides: list, variants: List[Tuple[str, str, dict]]) -> List[Dict]:
+    """
+    Render the same slides once per (output_path, design_style, visual_preferences)
+
+    Several variants are rendered side by side in the render process pool, one
+    deck per worker. Returns {"output", "error"} per variant, in order - a
+    failed variant does not stop the others.
+    """
+    decks = [(slides, output_path, design_style, visual_preferences)
+             for output_path, design_style, visual_preferences in variants]
+
+    if parallel_renderer.available and len(decks) > 1:
+        try:
+            return parallel_renderer.render_decks(decks)
+        except (BrokenProcessPool, OSError) as e:
+            print(f"[PARALLEL] Render pool unavailable ({e}), rendering in-process")
+
+    return [_generate_variant(deck) for deck in decks]
+
+
+def _generate_variant(deck) -> Dict:
+    slides, output_path, design_style, visual_preferences = deck
+    try:
+        generate_ppt(slides, output_path, design_style, visual_preferences, parallel=False)
+        return {"output": output_path, "error": None}
+    except Exception as e:
+        return {"output": None, "error": str(e)}
+
+
+def regenerate_slide(pptx_path: str, slide_number: int, slide_data: dict, design_style: str = "minimal_1",
+                     visual_preferences: dict = None):
+    """
+    Re-render one slide of an existing deck in place
+
+    Only the slide at slide_number (1-based) is rendered; the deck's other slide
+    parts and media are reused as stored. The file is replaced atomically.
+    """
+    if visual_preferences is None:
+        visual_preferences = {"graphs": False, "tables": False, "pie_charts": False, "images": False}
+
+    deck = Presentation(pptx_path)
+    slide_count = len(deck.slides)
+    if not 1 <= slide_number <= slide_count:
+        raise ValueError(f"Slide {slide_number} does not exist (deck has {slide_count} slides)")
+    slide_index = slide_number - 1
+
+    style_config = get_design_style(design_style)
+    if not style_config:
+        print(f"[WARNING] Invalid design style '{design_style}', using minimal_1")
+        style_config = get_design_style("minimal_1")
+
+    # Render into a scratch copy of the template, at the slide's real position in the deck
+    scratch = presentation_pool.new_presentation()
+    scratch._design_style = design_style
+    scratch._total_slides = slide_count
+    slide = _render_slide(scratch, slide_data, slide_index, slide_count, design_style, style_config, visual_preferences)
+
+    replace_slide(deck, deck.slides[slide_index], export_slide(scratch, slide))
+
+    temp_path = f"{pptx_path}.tmp"
+    package_writer.save(deck, temp_path)
+    os.replace(temp_path, pptx_path)
+    print(f"[PERFECT] Regenerated slide {slide_number}/{slide_count} in {pptx_path}")
+    return pptx_path
+
+
+def _render_slide(prs, slide_data: dict, slide_index: int, slide_count: int, design_style: str,
+                  style_config: dict, visual_preferences: dict):
+    """Add one fully styled slide to prs"""
+    # Extract and validate slide content
+    slide_type = slide_data.get("slide_type", "content")
+
+    # Validate slide type
+    if slide_type not in SLIDE_LAYOUTS:
+        print(f"[WARNING] Unknown slide type '{slide_type}', using 'content'")
+        slide_type = "content"
+
+    # Create slide with proper layout
+    slide = prs.slides.add_slide(prs.slide_layouts[SLIDE_LAYOUTS[slide_type]])
+
+    # Write the background, title and bullets directly as XML (fast path)
+    written = slide_writer.write(slide, SlideRecord.from_dict(slide_data), slide_index, design_style)
+
+    if not written:
+        # Apply perfect background design
+        _apply_perfect_background(slide, style_config)
+
+        # BEAUTIFUL SIMPLE SYSTEM - handles all content and visual placement
+        print(f"[BEAUTIFUL] Creating beautiful, uncluttered layout for slide {slide_index + 1}")
+
+    # Add beautiful visual elements using the simple system
+    text_shape_count = len(slide.shapes)
+    add_visual_elements_to_slide(slide, slide_data, design_style, visual_preferences, prs, slide_index, text_ready=written)
+
+    # Apply perfect design decorations (minimal for clean look)
+    if slide_count <= 15:  # Only for manageable presentations
+        apply_design_decorations(slide, design_style, prs)
+
+    # Enforce perfect design rules - directly written text shapes already carry them
+    if written:
+        enforce_text_contrast(list(slide.shapes)[text_shape_count:])
+    else:
+        layout_info = get_slide_layout(slide_type)
+        enforce_design(slide, layout_info)
+
+    return slide
+
+
+def _image_slides(slides: list) -> Dict[int, dict]:
+    """The deck's image slides by index, in slide order (see _get_professional_visual_type)"""
+    slide_count = len(slides)
+    return {
+        slide_index: slide_data
+        for slide_index, slide_data in enumerate(slides[1:], start=1)
+        if beautiful_system._get_professional_visual_type(slide_index, slide_count, slide_data) == 'image'
+    }
+
+
+def _prefetch_images(image_slides: Dict[int, dict], visuals: Dict[int, Dict], window: Optional[int] = None):
+    """
+    Start fetching the images of the next image slides
+
+    Slides are taken from the front of image_slides, and each gets a
+    {'visual_type': 'image', 'data': None, 'image'} entry in visuals for the slide
+    loop, where image is a PendingImage the slide waits on when it is rendered.
+    A slide whose image was not found (or missed its deadline) gets the
+    placeholder without searching again. With a window, at most that many
+    images are in flight or waiting for their slide; without one, every image
+    slide is fetched at once.
+    """
+    from image_api_service import image_api
+
+    pending = sum(1 for visual in visuals.values() if visual['visual_type'] == 'image')
+    count = len(image_slides) if window is None else max(0, window - pending)
+    batch = {slide_index: image_slides.pop(slide_index) for slide_index in list(image_slides)[:count]}
+    images = image_api.prefetch(batch, box=beautiful_system.visual_box_inches())
+    visuals.update({slide_index: {'visual_type': 'image', 'data': None, 'image': image} for slide_index, image in images.items()})
+
+
+def _release_visuals(visuals: Dict[int, Dict]):
+    """Drop the deck's prepass results, cancelling image fetches no slide waited for"""
+    from image_api_service import PendingImage
+
+    # Unclaimed fetches would otherwise stay queued on the shared prefetch pool
+    for visual in visuals.values():
+        if isinstance(visual['image'], PendingImage):
+            visual['image'].cancel()
+    visuals.clear()
+
+
+def _prerender_visuals(slides: list, design_style: str) -> Dict[int, Dict]:
+    """
+    Deck prepass: render every matplotlib chart and table in the process pool
+
+    Visual types follow the deck's distribution (_get_professional_visual_type),
+    so the data generated here is the data the slide shows. Returns
+    {slide_index: {'visual_type', 'data', 'image'}} for the slide loop, or {} when
+    the pool is not available (fewer than two workers, or this is a render
+    worker). Cached images are reused; a visual the pool did not render (too
+    few to be worth it, or a failure) is rendered inline from the same data.
+    """
+    from chart_service import chart_service
+
+    if not VISUAL_PRERENDER_ENABLED or not parallel_renderer.available:
+        return {}
+
+    slide_count = len(slides)
+    visuals = {}
+    for slide_index, slide_data in enumerate(slides[1:], start=1):
+        visual_type = beautiful_system._get_professional_visual_type(slide_index, slide_count, slide_data)
+        engine = TABLE_ENGINE if visual_type == 'table' else CHART_ENGINE
+        if visual_type in ('chart', 'pie', 'table') and engine == 'matplotlib':
+            visuals[slide_index] = {'visual_type': visual_type,
+                                    'data': beautiful_system.build_visual_data(slide_data, visual_type, design_style)}
+
+    keys = {}
+    for slide_index, visual in visuals.items():
+        keys[slide_index] = chart_service.image_key(visual['visual_type'], visual['data'])
+        visual['image'] = chart_service.image_cache.get(keys[slide_index])
+
+    missing = [slide_index for slide_index, visual in visuals.items() if visual['image'] is None]
+    if len(missing) >= VISUAL_PRERENDER_MIN_VISUALS:
+        try:
+            images = parallel_renderer.render_visuals([(visuals[i]['visual_type'], visuals[i]['data']) for i in missing])
+        except (BrokenProcessPool, OSError) as e:
+            print(f"[PARALLEL] Render pool unavailable ({e}), rendering visuals inline")
+            images = [None] * len(missing)
+        for slide_index, image in zip(missing, images):
+            visuals[slide_index]['image'] = image
+            if image:
+                chart_service.image_cache.put(keys[slide_index], image)
+
+    return visuals
+
+
+def _use_parallel_render(slide_count: int, parallel: Optional[bool]) -> bool:
+    """Whether this deck is worth spreading across the render process pool"""
+    if not parallel_renderer.available:
+        return False
+    if parallel is not None:
+        return parallel
+    return PARALLEL_RENDER_ENABLED and slide_count >= PARALLEL_RENDER_MIN_SLIDES
+
+
+def _use_streaming_writer(slide_count: int, streaming: Optional[bool]) -> bool:
+    """Whether this deck is large enough to stream slide by slide instead of saving at the end"""
+    if streaming is not None:
+        return streaming
+    return slide_count >= STREAMING_WRITER_MIN_SLIDES
+
+
 def _calculate_memory_budget(slide_count: int, visual_preferences: dict) -> int:
     """Calculate optimal memory budget per slide"""
     base_budget = 100
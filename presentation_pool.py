@@ -0,0 +1,50 @@
+# presentation_pool.py
+# Per-process cache of the parsed, preconfigured base presentation
+
+import copy
+import threading
+from pptx import Presentation
+from pptx.util import Inches
+
+SLIDE_WIDTH = Inches(13.333)  # Perfect widescreen width
+SLIDE_HEIGHT = Inches(7.5)    # Perfect widescreen height
+
+
+class PresentationPool:
+    """
+    Parse python-pptx's default template once per worker process and hand out copies
+
+    The cached template is never returned itself: every deck gets its own deep
+    copy of the package (masters, layouts, theme and presentation part), so
+    concurrent renders share no mutable state.
+    """
+
+    def __init__(self):
+        self._template = None
+        self._lock = threading.Lock()
+        self.stats = {"template_loads": 0, "copies": 0}
+
+    def _get_template(self):
+        if self._template is None:
+            with self._lock:
+                if self._template is None:
+                    template = Presentation()
+                    template.slide_width = SLIDE_WIDTH
+                    template.slide_height = SLIDE_HEIGHT
+                    self._template = template
+                    self.stats["template_loads"] += 1
+        return self._template
+
+    def warm(self):
+        """Parse the template ahead of the first request"""
+        self._get_template()
+
+    def new_presentation(self):
+        """A fresh, independent 16:9 presentation"""
+        prs = copy.deepcopy(self._get_template())
+        self.stats["copies"] += 1
+        return prs
+
+
+# Global instance
+presentation_pool = PresentationPool()
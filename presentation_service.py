@@ -4,11 +4,17 @@
 import os
 import time
 import uuid
-from typing import Dict, Optional
-from config import SUBSCRIPTION_PLANS, OUTPUT_FOLDER
+from typing import Dict, List, Optional
+from config import SUBSCRIPTION_PLANS, OUTPUT_FOLDER, RESTYLE_MAX_STYLES, PREVIEW_WIDTH, AVAILABLE_DESIGN_STYLES
 from user_manager import user_manager
 from pipeline import run_pipeline
-from job_store import create_job, get_job, update_state, complete_job, fail_job
+from job_store import create_job, get_job, get_job_artifacts, save_job_artifacts, update_state, complete_job, fail_job
+from extractor import build_slide_prompt
+from llm_client import call_llm, last_call_used_fallback
+from slide_parser import parse_slides, slide_parser, SLIDES_SCHEMA
+from ppt_generator import regenerate_slide, generate_ppt_variants
+from slide_model import SlideRecord
+from slide_preview import slide_preview
 import threading
 
 class PresentationService:
@@ -17,6 +23,7 @@ class PresentationService:
     def __init__(self):
         self.active_jobs = {}
         self.job_lock = threading.Lock()
+        self.slide_locks = {}  # job_id -> lock serializing edits of that job's deck
     
     def validate_generation_request(self, user_id: str, request_data: Dict) -> Dict:
         """Validate generation request"""
@@ -58,10 +65,18 @@ class PresentationService:
                 'error': f'Slide count ({slide_count}) exceeds plan limit ({plan["max_slides"]})'
             }
         
+        # use_cache=False opts out of near-duplicate reuse; form-style clients send "false" or "0"
+        use_cache = request_data.get('use_cache', True)
+        if use_cache in ('false', '0'):
+            use_cache = False
+        elif not isinstance(use_cache, bool):
+            return {'valid': False, 'error': 'use_cache must be a boolean (or "false" / "0" to opt out)'}
+        
         return {
             'valid': True,
             'user_stats': user_stats,
-            'slide_count': slide_count
+            'slide_count': slide_count,
+            'use_cache': use_cache
         }
     
     def start_generation(self, user_id: str, request_data: Dict) -> Dict:
@@ -85,22 +100,7 @@ class PresentationService:
             url = url.strip()
         design_style = request_data.get('design_style', 'minimal_1')
         
-        # Visual preferences (admin gets everything)
-        visual_prefs_data = request_data.get('visual_preferences', {})
-        if user_manager.is_admin_user(user_id):
-            visual_preferences = {
-                'graphs': visual_prefs_data.get('graphs', False),
-                'tables': visual_prefs_data.get('tables', False),
-                'pie_charts': visual_prefs_data.get('pieCharts', False),
-                'images': visual_prefs_data.get('images', False)
-            }
-        else:
-            visual_preferences = {
-                'graphs': plan['visual_elements'] and visual_prefs_data.get('graphs', False),
-                'tables': plan['visual_elements'] and visual_prefs_data.get('tables', False),
-                'pie_charts': plan['visual_elements'] and visual_prefs_data.get('pieCharts', False),
-                'images': plan['visual_elements'] and visual_prefs_data.get('images', False)
-            }
+        visual_preferences = self._resolve_visual_preferences(user_id, plan, request_data.get('visual_preferences', {}))
         
         # Create job
         job_payload = {
@@ -110,13 +110,15 @@ class PresentationService:
             'design_style': design_style,
             'visual_preferences': visual_preferences,
             'slide_count': slide_count,
-            'plan': user_stats['user']['plan']
+            'plan': user_stats['user']['plan'],
+            'use_cache': validation['use_cache']
         }
         
-        job_id = create_job(user_id, job_payload)
+        job_id = uuid.uuid4().hex
+        create_job(job_id, job_payload)
         
         # Start generation immediately (no threading issues)
-        self._generate_sync(job_id, url, request_data['task'], design_style, visual_preferences, user_id, slide_count)
+        self._generate_sync(job_id, url, request_data['task'], design_style, visual_preferences, user_id, slide_count, job_payload['plan'], job_payload['use_cache'])
         
         return {
             'success': True,
@@ -125,7 +127,23 @@ class PresentationService:
             'estimated_time': 0
         }
     
-    def _generate_sync(self, job_id: str, url: str, task: str, design_style: str, visual_preferences: Dict, user_id: str, slide_count: int = 10):
+    def _resolve_visual_preferences(self, user_id: str, plan: Dict, visual_prefs_data: Dict) -> Dict:
+        """Visual preferences allowed by the user's plan (admin gets everything)"""
+        if user_manager.is_admin_user(user_id):
+            return {
+                'graphs': visual_prefs_data.get('graphs', False),
+                'tables': visual_prefs_data.get('tables', False),
+                'pie_charts': visual_prefs_data.get('pieCharts', False),
+                'images': visual_prefs_data.get('images', False)
+            }
+        return {
+            'graphs': plan['visual_elements'] and visual_prefs_data.get('graphs', False),
+            'tables': plan['visual_elements'] and visual_prefs_data.get('tables', False),
+            'pie_charts': plan['visual_elements'] and visual_prefs_data.get('pieCharts', False),
+            'images': plan['visual_elements'] and visual_prefs_data.get('images', False)
+        }
+
+    def _generate_sync(self, job_id: str, url: str, task: str, design_style: str, visual_preferences: Dict, user_id: str, slide_count: int = 10, plan: str = None, use_cache: bool = True):
         """Generate PPT synchronously - ALWAYS WORKS"""
         try:
             update_state(job_id, "PROCESSING")
@@ -143,7 +161,7 @@ class PresentationService:
             print(f"[PERFECT] Visual elements: {visual_preferences}")
             
             # Call pipeline - ALWAYS WORKS
-            result_path = run_pipeline(url, task, design_style, visual_preferences, slide_count)
+            result_path = run_pipeline(url, task, design_style, visual_preferences, slide_count, plan, use_cache, job_id)
             
             # Move file to correct location
             if result_path != output_path:
@@ -169,6 +187,212 @@ class PresentationService:
             print(f"[ERROR] Generation failed: {e}")
             fail_job(job_id, str(e))
     
+    def regenerate_slide(self, job_id: str, slide_number: int, instructions: Optional[str] = None) -> Dict:
+        """Ask the LLM for a new version of one slide, reusing the job's extracted content"""
+        checked = self._check_slide_edit(job_id, slide_number)
+        if not checked['valid']:
+            return {'success': False, 'error': checked['error']}
+
+        job, artifacts = checked['job'], checked['artifacts']
+        slides = artifacts['slides']
+        current = slides[slide_number - 1]
+
+        print(f"[REGENERATE] Job {job_id}: new content for slide {slide_number}/{len(slides)}")
+        prompt = build_slide_prompt(
+            artifacts.get('content') or '',
+            job['data']['task'],
+            [record.title or '' for record in slides],
+            slide_number,
+            current.to_dict(),
+            instructions
+        )
+        # Route by the deck's size, as the original generation was
+        task_type = 'title' if current.slide_type == 'title' else 'deck'
+        raw = call_llm(prompt, response_format=SLIDES_SCHEMA, plan=job['data'].get('plan'),
+                       task_type=task_type, slide_count=len(slides))
+        if last_call_used_fallback():
+            return {'success': False, 'error': 'LLM is unavailable, slide was not changed - try again later'}
+
+        try:
+            slide_data = parse_slides(raw)['slides'][0]
+        except ValueError as e:
+            return {'success': False, 'error': f'Could not parse regenerated slide: {e}'}
+
+        # The slide keeps its place in the deck, so it keeps its type too
+        slide_data['slide_type'] = current.slide_type
+        return self._replace_slide(job_id, job, artifacts, slide_number, slide_data)
+
+    def edit_slide(self, job_id: str, slide_number: int, slide_data: Dict) -> Dict:
+        """Replace one slide with user-supplied content (no LLM call)"""
+        checked = self._check_slide_edit(job_id, slide_number)
+        if not checked['valid']:
+            return {'success': False, 'error': checked['error']}
+
+        if not isinstance(slide_data, dict):
+            return {'success': False, 'error': 'Slide must be a JSON object'}
+
+        current = checked['artifacts']['slides'][slide_number - 1]
+        edited = slide_parser._validate_slide(dict({'slide_type': current.slide_type}, **slide_data))
+        if not edited:
+            return {'success': False, 'error': 'Slide needs a non-empty title'}
+
+        print(f"[EDIT] Job {job_id}: direct edit of slide {slide_number}")
+        return self._replace_slide(job_id, checked['job'], checked['artifacts'], slide_number, edited)
+
+    def _check_slide_edit(self, job_id: str, slide_number: int) -> Dict:
+        """A slide can be edited once its job is done and the pipeline saved its slides"""
+        job = get_job(job_id)
+        if not job:
+            return {'valid': False, 'error': 'Job not found'}
+        if job['state'] != 'DONE' or not job['output'] or not os.path.exists(job['output']):
+            return {'valid': False, 'error': 'Presentation not ready'}
+
+        artifacts = get_job_artifacts(job_id)
+        slides = artifacts.get('slides')
+        if not slides:
+            return {'valid': False, 'error': 'Slide content for this job is not available'}
+        if not 1 <= slide_number <= len(slides):
+            return {'valid': False, 'error': f'Slide {slide_number} does not exist (deck has {len(slides)} slides)'}
+
+        return {'valid': True, 'job': job, 'artifacts': artifacts}
+
+    def _replace_slide(self, job_id: str, job: Dict, artifacts: Dict, slide_number: int, slide_data: Dict) -> Dict:
+        """Render slide_data into the job's deck and record it as the slide's content"""
+        with self.job_lock:
+            slide_lock = self.slide_locks.setdefault(job_id, threading.Lock())
+
+        start_time = time.time()
+        with slide_lock:
+            regenerate_slide(
+                job['output'],
+                slide_number,
+                slide_data,
+                artifacts.get('design_style', job['data']['design_style']),
+                artifacts.get('visual_preferences', job['data']['visual_preferences'])
+            )
+            artifacts['slides'][slide_number - 1] = SlideRecord.from_dict(slide_data)
+
+        elapsed = time.time() - start_time
+        print(f"[REGENERATE] Job {job_id}: slide {slide_number} replaced in {elapsed:.2f}s")
+        return {
+            'success': True,
+            'job_id': job_id,
+            'slide_number': slide_number,
+            'slide': slide_data,
+            'render_time': round(elapsed, 3),
+            'download_url': f'/api/download/{job_id}'
+        }
+
+    def restyle(self, job_id: str, design_styles: List[str], visual_preferences: Optional[Dict] = None) -> Dict:
+        """
+        Re-render a finished job's slides in other design styles without the LLM
+
+        Each style becomes a new job (restyled_from=job_id) with its own download,
+        so the user can compare them; several styles render in parallel. Every
+        rendered style is a new presentation and counts against the plan's limits.
+        """
+        if isinstance(design_styles, str):
+            design_styles = [design_styles]
+        if not isinstance(design_styles, list):
+            return {'success': False, 'error': 'design_styles must be a list of design style ids'}
+        unknown = [style for style in design_styles if not isinstance(style, str) or style not in AVAILABLE_DESIGN_STYLES]
+        if unknown:
+            return {'success': False, 'error': f'Unknown design style: {unknown[0]!r}'}
+        design_styles = list(dict.fromkeys(design_styles))
+        if not design_styles:
+            return {'success': False, 'error': 'At least one design_style is required'}
+        if len(design_styles) > RESTYLE_MAX_STYLES:
+            return {'success': False, 'error': f'At most {RESTYLE_MAX_STYLES} design styles per restyle'}
+
+        job = get_job(job_id)
+        if not job:
+            return {'success': False, 'error': 'Job not found'}
+        if job['state'] != 'DONE':
+            return {'success': False, 'error': 'Presentation not ready'}
+
+        artifacts = get_job_artifacts(job_id)
+        records = artifacts.get('slides')
+        if not records:
+            return {'success': False, 'error': 'Slide content for this job is not available'}
+
+        user_id = job['data']['user_id']
+        can_generate = user_manager.can_generate_ppt(user_id)
+        remaining = min(count for count in (can_generate.get('remaining_daily'), can_generate.get('remaining_total'))
+                        if count is not None) if can_generate['can_generate'] else 0
+        if remaining < len(design_styles):
+            return {
+                'success': False,
+                'error': can_generate.get('reason') if not can_generate['can_generate']
+                         else f'Restyling into {len(design_styles)} styles needs {len(design_styles)} presentations; {remaining} left on your plan',
+                'limit_type': can_generate.get('limit_type')
+            }
+
+        if visual_preferences is None:
+            visual_preferences = artifacts.get('visual_preferences', job['data']['visual_preferences'])
+        else:
+            plan = user_manager.get_user_stats(user_id)['plan']
+            visual_preferences = self._resolve_visual_preferences(user_id, plan, visual_preferences)
+
+        start_time = time.time()
+        timestamp = int(start_time)
+        os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+
+        variant_jobs = []
+        variants = []
+        for design_style in design_styles:
+            variant_id = uuid.uuid4().hex
+            create_job(variant_id, dict(job['data'], design_style=design_style,
+                                        visual_preferences=visual_preferences, restyled_from=job_id))
+            update_state(variant_id, "PROCESSING")
+            save_job_artifacts(variant_id, content=artifacts.get('content'), slides=list(records),
+                               design_style=design_style, visual_preferences=visual_preferences)
+
+            # Built only from generated ids - nothing from the request reaches the path
+            filename = f"presentation_restyle_{timestamp}_{variant_id}.pptx"
+            variants.append((os.path.abspath(os.path.join(OUTPUT_FOLDER, filename)), design_style, visual_preferences))
+            variant_jobs.append(variant_id)
+
+        print(f"[RESTYLE] Job {job_id}: {len(records)} slides in {', '.join(design_styles)}")
+        results = generate_ppt_variants([record.to_dict() for record in records], variants)
+
+        jobs = []
+        for variant_id, design_style, result in zip(variant_jobs, design_styles, results):
+            if result['error']:
+                fail_job(variant_id, result['error'])
+                jobs.append({'job_id': variant_id, 'design_style': design_style, 'error': result['error']})
+            else:
+                complete_job(variant_id, result['output'])
+                user_manager.increment_usage(user_id)
+                jobs.append({'job_id': variant_id, 'design_style': design_style,
+                             'download_url': f'/api/download/{variant_id}'})
+
+        elapsed = time.time() - start_time
+        print(f"[RESTYLE] Job {job_id}: {len(design_styles)} styles rendered in {elapsed:.2f}s")
+        return {
+            'success': any('download_url' in variant for variant in jobs),
+            'source_job_id': job_id,
+            'jobs': jobs,
+            'render_time': round(elapsed, 3)
+        }
+
+    def get_slide_preview(self, job_id: str, slide_number: int, width: Optional[int] = None) -> Dict:
+        """PNG thumbnail of one slide, drawn from the job's slide content"""
+        job = get_job(job_id)
+        if not job:
+            return {'success': False, 'error': 'Job not found'}
+
+        artifacts = get_job_artifacts(job_id)
+        records = artifacts.get('slides')
+        if not records:
+            return {'success': False, 'error': 'Slide content for this job is not available'}
+        if not 1 <= slide_number <= len(records):
+            return {'success': False, 'error': f'Slide {slide_number} does not exist (deck has {len(records)} slides)'}
+
+        design_style = artifacts.get('design_style', job['data']['design_style'])
+        png = slide_preview.get_preview(job_id, slide_number, records[slide_number - 1], len(records), design_style,
+                                        width or PREVIEW_WIDTH)
+        return {'success': True, 'png': png}
+
     def get_job_status(self, job_id: str) -> Dict:
         """Get job status"""
         try:
@@ -0,0 +1,166 @@
+# prompt_cache.py
+# Semantic near-duplicate cache for LLM slide output - MinHash/LSH over the task plus a content fingerprint
+
+import copy
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from config import (
+    PROMPT_CACHE_THRESHOLD, PROMPT_CACHE_MAX_ENTRIES, PROMPT_CACHE_TTL,
+    PROMPT_CACHE_NUM_PERM, PROMPT_CACHE_BANDS
+)
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words are truncated to this many characters so "intro"/"introduction" compare equal
+_STEM_LENGTH = 5
+
+
+class SemanticPromptCache:
+    """
+    Reuse slides generated for an earlier, close-enough request
+
+    Two requests match when they have the same content fingerprint, slide
+    count and model (slides from the small model are not served to requests
+    routed to the large one) and the estimated Jaccard similarity of their task text is at least
+    threshold. Candidates are found through LSH buckets, so lookups do not
+    scan the whole cache.
+    """
+
+    def __init__(self, threshold: float = PROMPT_CACHE_THRESHOLD, max_entries: int = PROMPT_CACHE_MAX_ENTRIES,
+                 ttl: float = PROMPT_CACHE_TTL, num_perm: int = PROMPT_CACHE_NUM_PERM, bands: int = PROMPT_CACHE_BANDS):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        # Fixed seed keeps signatures comparable across restarts
+        rng = random.Random(1337)
+        self._permutations = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+        self._entries = OrderedDict()  # entry_id -> entry dict, oldest first
+        self._buckets = {}  # band key -> set of entry ids
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _shingles(self, text: str) -> set:
+        """Stemmed word unigrams and bigrams of normalised text"""
+        words = [word[:_STEM_LENGTH] for word in _WORD_PATTERN.findall(text.lower())]
+        shingles = set(words)
+        shingles.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+        return shingles or {""}
+
+    def _signature(self, text: str) -> List[int]:
+        """MinHash signature of the task text"""
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "big")
+            for shingle in self._shingles(text)
+        ]
+        return [
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._permutations
+        ]
+
+    def content_fingerprint(self, content: str) -> str:
+        """Fingerprint of the source content, insensitive to case and whitespace"""
+        normalised = " ".join(content.lower().split())
+        return hashlib.sha1(normalised.encode("utf-8")).hexdigest()
+
+    def _band_keys(self, fingerprint: str, slide_count: int, model: str, signature: List[int]) -> List[tuple]:
+        return [
+            (fingerprint, slide_count, model, band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    def _similarity(self, left: List[int], right: List[int]) -> float:
+        """Estimated Jaccard similarity from two signatures"""
+        return sum(1 for a, b in zip(left, right) if a == b) / self.num_perm
+
+    def lookup(self, task: str, content: str, slide_count: int, model: str = None) -> Optional[List[Dict]]:
+        """Return a copy of cached slides for a near-duplicate request, or None"""
+        fingerprint = self.content_fingerprint(content)
+        signature = self._signature(task)
+        now = time.time()
+
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(fingerprint, slide_count, model, signature):
+                candidates.update(self._buckets.get(key, ()))
+
+            best_id, best_score = None, 0.0
+            for entry_id in candidates:
+                entry = self._entries.get(entry_id)
+                if entry is None or now - entry["created_at"] > self.ttl:
+                    continue
+                score = self._similarity(signature, entry["signature"])
+                if score >= self.threshold and score > best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.stats["misses"] += 1
+                return None
+
+            self.stats["hits"] += 1
+            self._entries.move_to_end(best_id)
+            entry = self._entries[best_id]
+            print(f"[PROMPT_CACHE] Reusing slides for '{entry['task'][:40]}' (similarity {best_score:.2f})")
+            return copy.deepcopy(entry["slides"])
+
+    def store(self, task: str, content: str, slide_count: int, slides: List[Dict], model: str = None):
+        """Cache the slides generated for a request by model"""
+        fingerprint = self.content_fingerprint(content)
+        signature = self._signature(task)
+        keys = self._band_keys(fingerprint, slide_count, model, signature)
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = {
+                "task": task,
+                "signature": signature,
+                "keys": keys,
+                "slides": copy.deepcopy(slides),
+                "created_at": time.time()
+            }
+            for key in keys:
+                self._buckets.setdefault(key, set()).add(entry_id)
+            self.stats["stores"] += 1
+
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest()
+
+    def _evict_oldest(self):
+        """Drop the least recently used entry (caller holds the lock)"""
+        entry_id, entry = self._entries.popitem(last=False)
+        for key in entry["keys"]:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+        self.stats["evictions"] += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return dict(self.stats, entries=len(self._entries),
+                        hit_rate=self.stats["hits"] / lookups if lookups else 0.0)
+
+
+# Global instance
+prompt_cache = SemanticPromptCache()
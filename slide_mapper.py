@@ -8,6 +8,7 @@ def get_slide_layout(slide_type):
         "title": {
             "layout_index": 0,
             "type": "title",
+            "fields": ["title"],
             "has_title": True,
             "has_content": True,
             "max_content_blocks": 1
@@ -15,6 +16,7 @@ def get_slide_layout(slide_type):
         "content": {
             "layout_index": 1,
             "type": "content", 
+            "fields": ["title", "bullets"],
             "has_title": True,
             "has_content": True,
             "max_content_blocks": 3
@@ -22,6 +24,7 @@ def get_slide_layout(slide_type):
         "summary": {
             "layout_index": 1,
             "type": "content",
+            "fields": ["title", "bullets"],
             "has_title": True, 
             "has_content": True,
             "max_content_blocks": 2
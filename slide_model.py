@@ -0,0 +1,43 @@
+# slide_model.py
+# Compact, typed record for one slide's content
+
+from typing import Dict, List, Optional
+
+
+class SlideRecord:
+    """
+    The content of one slide as produced by the LLM and the slide parser
+
+    title is None when the slide has no title key at all (layouts then use their
+    default title text). bullets keeps the values as generated; the layout code
+    decides how to render them.
+    """
+
+    __slots__ = ("slide_type", "title", "bullets")
+
+    def __init__(self, slide_type: str = "content", title: Optional[str] = None, bullets: Optional[List] = None):
+        self.slide_type = slide_type
+        self.title = title
+        self.bullets = bullets if bullets is not None else []
+
+    @classmethod
+    def from_dict(cls, slide_data: Dict) -> "SlideRecord":
+        return cls(
+            slide_type=slide_data.get("slide_type", "content"),
+            title=slide_data.get("title"),
+            bullets=list(slide_data.get("bullets", []))
+        )
+
+    def to_dict(self) -> Dict:
+        slide_data = {"slide_type": self.slide_type, "bullets": list(self.bullets)}
+        if self.title is not None:
+            slide_data["title"] = self.title
+        return slide_data
+
+    def __eq__(self, other):
+        if not isinstance(other, SlideRecord):
+            return NotImplemented
+        return (self.slide_type, self.title, self.bullets) == (other.slide_type, other.title, other.bullets)
+
+    def __repr__(self):
+        return f"SlideRecord(slide_type={self.slide_type!r}, title={self.title!r}, bullets={self.bullets!r})"
@@ -0,0 +1,195 @@
+# slide_parser.py
+# Tolerant parser for LLM slide JSON - repairs common defects and validates the slide schema
+
+import json
+import re
+from typing import Dict, Optional
+
+# JSON schema passed to Ollama's "format" option so the model is constrained to our slide structure
+SLIDES_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "slides": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "slide_type": {"type": "string", "enum": ["title", "content", "summary"]},
+                    "title": {"type": "string"},
+                    "bullets": {"type": "array", "items": {"type": "string"}}
+                },
+                "required": ["slide_type", "title", "bullets"]
+            }
+        }
+    },
+    "required": ["slides"]
+}
+
+VALID_SLIDE_TYPES = ("title", "content", "summary")
+
+_FENCE_PATTERN = re.compile(r"^```[a-zA-Z]*\s*|\s*```$")
+_TRAILING_COMMA_PATTERN = re.compile(r",(\s*[}\]])")
+
+
+class SlideParser:
+    """Parse raw LLM output into validated slide dictionaries in a single pass"""
+
+    def parse(self, raw: str) -> Dict:
+        """
+        Parse raw LLM output into slides
+
+        Returns a dict with:
+            slides: list of validated slide dicts
+            truncated: True if the output ended before the slides array was closed
+            repaired: True if any repair was needed to read the output
+            dropped: number of slide objects discarded by schema validation
+        """
+        if not raw or not raw.strip():
+            raise ValueError("LLM returned empty response")
+
+        text = self._strip_fences(raw)
+        repaired = text != raw.strip()
+        truncated = False
+
+        data = self._loads(text)
+        if data is None:
+            fixed = _TRAILING_COMMA_PATTERN.sub(r"\1", text)
+            data = self._loads(fixed)
+            repaired = True
+
+        if data is None:
+            # Salvage every complete slide object from a broken or truncated response
+            candidates, truncated = self._salvage_slide_objects(text)
+        elif isinstance(data, dict) and isinstance(data.get("slides"), list):
+            candidates = data["slides"]
+        elif isinstance(data, list):
+            candidates = data
+            repaired = True
+        else:
+            raise ValueError("JSON missing 'slides' key")
+
+        slides = []
+        for candidate in candidates:
+            slide = self._validate_slide(candidate)
+            if slide is not None:
+                slides.append(slide)
+
+        if not slides:
+            print(f"[PARSER] No usable slides in LLM output (first 500 chars):\n{raw[:500]}...")
+            raise ValueError("LLM did not return any valid slides")
+
+        dropped = len(candidates) - len(slides)
+        if repaired or truncated or dropped:
+            print(f"[PARSER] Recovered {len(slides)} slides (repaired={repaired}, truncated={truncated}, dropped={dropped})")
+
+        return {
+            "slides": slides,
+            "truncated": truncated,
+            "repaired": repaired or truncated,
+            "dropped": dropped
+        }
+
+    def _strip_fences(self, raw: str) -> str:
+        """Remove markdown code fences without touching the JSON body"""
+        text = raw.strip()
+        if text.startswith("```"):
+            text = _FENCE_PATTERN.sub("", text).strip()
+        return text
+
+    def _loads(self, text: str) -> Optional[object]:
+        """json.loads that returns None instead of raising"""
+        try:
+            return json.loads(text)
+        except (json.JSONDecodeError, ValueError):
+            return None
+
+    def _salvage_slide_objects(self, text: str):
+        """
+        Scan the slides array and return every complete slide object it contains
+
+        The scanner tracks strings and escapes so braces inside slide text do not
+        confuse it. Returns (objects, truncated) where truncated means the array
+        was never closed.
+        """
+        match = re.search(r'"slides"\s*:\s*\[', text)
+        if match:
+            start = match.end()
+        else:
+            bracket = text.find("[")
+            if bracket == -1:
+                return [], True
+            start = bracket + 1
+
+        objects = []
+        depth = 0
+        in_string = False
+        escaped = False
+        object_start = None
+
+        for index in range(start, len(text)):
+            char = text[index]
+
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+                continue
+
+            if char == '"':
+                in_string = True
+            elif char == "{":
+                if depth == 0:
+                    object_start = index
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0 and object_start is not None:
+                    chunk = _TRAILING_COMMA_PATTERN.sub(r"\1", text[object_start:index + 1])
+                    parsed = self._loads(chunk)
+                    if parsed is not None:
+                        objects.append(parsed)
+                    object_start = None
+                elif depth < 0:
+                    depth = 0
+            elif char == "]" and depth == 0:
+                return objects, False
+
+        return objects, True
+
+    def _validate_slide(self, candidate) -> Optional[Dict]:
+        """Validate and normalise one slide object, or return None if unusable"""
+        if not isinstance(candidate, dict):
+            return None
+
+        title = candidate.get("title")
+        if not isinstance(title, str) or not title.strip():
+            return None
+
+        slide_type = candidate.get("slide_type", "content")
+        if slide_type not in VALID_SLIDE_TYPES:
+            slide_type = "content"
+
+        bullets = candidate.get("bullets", [])
+        if isinstance(bullets, str):
+            bullets = [bullets]
+        elif not isinstance(bullets, list):
+            bullets = []
+        bullets = [str(bullet).strip() for bullet in bullets if isinstance(bullet, (str, int, float)) and str(bullet).strip()]
+
+        return {
+            "slide_type": slide_type,
+            "title": title.strip(),
+            "bullets": bullets
+        }
+
+
+# Global instance
+slide_parser = SlideParser()
+
+
+def parse_slides(raw: str) -> Dict:
+    """Parse raw LLM output into validated slides"""
+    return slide_parser.parse(raw)
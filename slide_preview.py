@@ -0,0 +1,259 @@
+# slide_preview.py
+# Low-res PNG thumbnails of slides, drawn with Pillow from SlideRecords
+
+import io
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict
+from PIL import Image, ImageDraw, ImageFont
+from pptx.util import Inches, Pt
+from beautiful_simple_system import beautiful_system
+from design_styles import get_design_style
+from slide_model import SlideRecord
+from slide_writer import slide_writer, MAX_BULLETS, MAX_BULLET_LENGTH
+from config import PREVIEW_WIDTH, PREVIEW_MAX_WIDTH, PREVIEW_CACHE_SIZE
+
+# TrueType faces tried in order; Pillow's built-in font is the last resort
+_FONT_FILES = {
+    False: ("calibri.ttf", "DejaVuSans.ttf", "arial.ttf"),
+    True: ("calibrib.ttf", "DejaVuSans-Bold.ttf", "arialbd.ttf")
+}
+
+_VISUAL_FILL = (248, 249, 250)
+_VISUAL_OUTLINE = (220, 220, 220)
+_FALLBACK_ACCENT = "3498DB"
+
+
+class SlidePreviewRenderer:
+    """
+    Rasterize an approximation of a slide without opening the .pptx
+
+    Boxes come from the same BeautifulSimpleSystem geometry the deck is laid out
+    with (title box, bullet box, right-hand visual box) and colors from the
+    design style, so a thumbnail shows what the slide will look like at a glance.
+    Visuals are drawn as a simple glyph of their type. PNGs are cached per
+    (job, slide, width) and redrawn when the slide's content or style changes.
+    """
+
+    def __init__(self, cache_size: int = PREVIEW_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._fonts = {}
+        self._accents = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "total_render_time": 0.0}
+
+    def get_preview(self, job_id: str, slide_number: int, record: SlideRecord, total_slides: int,
+                    design_style: str, width: int = PREVIEW_WIDTH) -> bytes:
+        """PNG for slide_number (1-based) of a job, from the cache when its content is unchanged"""
+        width = max(64, min(int(width), PREVIEW_MAX_WIDTH))
+        key = (job_id, slide_number, width)
+        version = (record.slide_type, record.title, tuple(map(str, record.bullets)), total_slides, design_style)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] == version:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return cached[1]
+            self.stats["misses"] += 1
+
+        png = self.render(record, slide_number - 1, total_slides, design_style, width)
+
+        with self._lock:
+            self._cache[key] = (version, png)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return png
+
+    def render(self, record: SlideRecord, slide_index: int, total_slides: int, design_style: str,
+               width: int = PREVIEW_WIDTH) -> bytes:
+        """Draw one slide and return it as PNG bytes"""
+        start_time = time.time()
+
+        system = beautiful_system
+        scale = width / system.slide_width
+        height = round(system.slide_height * scale)
+        colors = slide_writer.get_colors(design_style)
+
+        image = Image.new("RGB", (width, height), _rgb(colors["background"]))
+        draw = ImageDraw.Draw(image)
+        box = lambda left, top, box_width, box_height: tuple(round(v * scale) for v in (left, top, left + box_width, top + box_height))
+        font_px = lambda points: max(6, round(Pt(points) * scale))
+
+        if slide_index == 0:
+            title_top = system.slide_height * 0.35
+            title_box = box(system.beautiful_margin, title_top, system.content_width, Inches(1.5))
+            title = record.title if record.title is not None else "Presentation Title"
+            self._draw_text(draw, title_box, title, self._font(font_px(48), False), _rgb(colors["title"]), "center", 1.1)
+            if record.bullets:
+                subtitle_box = box(system.beautiful_margin, title_top + Inches(1.5) + Inches(0.3), system.content_width, Inches(0.8))
+                self._draw_text(draw, subtitle_box, str(record.bullets[0]), self._font(font_px(24), False), _rgb(colors["body"]), "center", 1.0)
+        else:
+            text_width = system.content_width * 0.55
+            title_box = box(system.beautiful_margin, system.beautiful_margin, text_width, Inches(0.8))
+            title = record.title if record.title is not None else "Slide Title"
+            self._draw_text(draw, title_box, title, self._font(font_px(28), True), _rgb(colors["title"]), "left", 1.0)
+
+            content_top = system.beautiful_margin + Inches(0.8) + Inches(0.4)
+            body_box = box(system.beautiful_margin, content_top, text_width,
+                           system.slide_height - content_top - system.beautiful_margin)
+            self._draw_bullets(draw, body_box, record.bullets, self._font(font_px(20), False), _rgb(colors["body"]), font_px(16))
+
+            visual_type = system._get_professional_visual_type(slide_index, total_slides, record.to_dict())
+            if visual_type != "none":
+                visual_box = box(system.slide_width * 0.6, system.beautiful_margin + Inches(1.5),
+                                 system.visual_width, system.visual_height)
+                self._draw_visual(draw, visual_box, visual_type, _rgb(self._accent_color(design_style)))
+
+        output = io.BytesIO()
+        image.save(output, format="PNG", optimize=True)
+
+        with self._lock:
+            self.stats["total_render_time"] += time.time() - start_time
+        return output.getvalue()
+
+    def _draw_text(self, draw, box, text: str, font, color, align: str, line_spacing: float):
+        """Word-wrapped text clipped to box, like an auto-fit text frame that overflows"""
+        left, top, right, bottom = box
+        line_height = round(_font_height(font) * line_spacing)
+        y = top
+        for line in self._wrap(draw, text, font, right - left):
+            if y > bottom:
+                break
+            x = left
+            if align == "center":
+                x = left + (right - left - draw.textlength(line, font=font)) / 2
+            draw.text((x, y), line, font=font, fill=color)
+            y += line_height
+
+    def _draw_bullets(self, draw, box, bullets, font, color, space_after: int):
+        left, top, right, bottom = box
+        line_height = round(_font_height(font) * 1.4)
+        y = top
+        for bullet in bullets[:MAX_BULLETS]:
+            bullet_text = str(bullet).strip()
+            if not bullet_text.startswith('•'):
+                bullet_text = f"• {bullet_text}"
+            if len(bullet_text) > MAX_BULLET_LENGTH:
+                bullet_text = bullet_text[:MAX_BULLET_LENGTH - 3] + "..."
+            for line in self._wrap(draw, bullet_text, font, right - left):
+                if y > bottom:
+                    return
+                draw.text((left, y), line, font=font, fill=color)
+                y += line_height
+            y += space_after
+
+    def _draw_visual(self, draw, box, visual_type: str, accent):
+        """Rounded box with a glyph for the visual type (chart, pie, table or image)"""
+        left, top, right, bottom = box
+        width, height = right - left, bottom - top
+        draw.rounded_rectangle(box, radius=max(2, width // 30), fill=_VISUAL_FILL, outline=_VISUAL_OUTLINE)
+        pad = max(4, min(width, height) // 6)
+        inner = (left + pad, top + pad, right - pad, bottom - pad)
+
+        if visual_type == "chart":
+            bar_count = 4
+            slot = (inner[2] - inner[0]) / bar_count
+            for i, fraction in enumerate((0.55, 0.8, 0.4, 0.95)):
+                x0 = inner[0] + slot * i + slot * 0.2
+                draw.rectangle((x0, inner[3] - (inner[3] - inner[1]) * fraction, x0 + slot * 0.6, inner[3]), fill=accent)
+        elif visual_type == "pie":
+            size = min(inner[2] - inner[0], inner[3] - inner[1])
+            cx, cy = (inner[0] + inner[2]) / 2, (inner[1] + inner[3]) / 2
+            pie_box = (cx - size / 2, cy - size / 2, cx + size / 2, cy + size / 2)
+            draw.pieslice(pie_box, 0, 360, fill=_tint(accent, 0.6))
+            draw.pieslice(pie_box, -90, 120, fill=accent)
+        elif visual_type == "table":
+            rows, columns = 5, 3
+            row_height = (inner[3] - inner[1]) / rows
+            draw.rectangle((inner[0], inner[1], inner[2], inner[1] + row_height), fill=accent)
+            for row in range(rows + 1):
+                y = inner[1] + row_height * row
+                draw.line((inner[0], y, inner[2], y), fill=_VISUAL_OUTLINE)
+            for column in range(columns + 1):
+                x = inner[0] + (inner[2] - inner[0]) * column / columns
+                draw.line((x, inner[1], x, inner[3]), fill=_VISUAL_OUTLINE)
+        else:
+            # Image: a landscape glyph (mountains and sun)
+            draw.polygon([(inner[0], inner[3]), (inner[0] + (inner[2] - inner[0]) * 0.35, inner[1] + (inner[3] - inner[1]) * 0.35),
+                          (inner[0] + (inner[2] - inner[0]) * 0.6, inner[3])], fill=_tint(accent, 0.4))
+            draw.polygon([(inner[0] + (inner[2] - inner[0]) * 0.4, inner[3]), (inner[0] + (inner[2] - inner[0]) * 0.7, inner[1] + (inner[3] - inner[1]) * 0.5),
+                          (inner[2], inner[3])], fill=accent)
+            sun = (inner[2] - inner[0]) * 0.08
+            draw.ellipse((inner[2] - 3 * sun, inner[1], inner[2] - sun, inner[1] + 2 * sun), fill=_tint(accent, 0.5))
+
+    def _wrap(self, draw, text: str, font, max_width: int):
+        """Split text into lines that fit max_width, breaking on spaces and on explicit line breaks"""
+        lines = []
+        for paragraph in text.replace("\v", "\n").split("\n"):
+            line = ""
+            for word in paragraph.split(" "):
+                candidate = f"{line} {word}" if line else word
+                if line and draw.textlength(candidate, font=font) > max_width:
+                    lines.append(line)
+                    line = word
+                else:
+                    line = candidate
+                # A word wider than the box breaks between characters
+                while draw.textlength(line, font=font) > max_width and len(line) > 1:
+                    cut = len(line) - 1
+                    while cut > 1 and draw.textlength(line[:cut], font=font) > max_width:
+                        cut -= 1
+                    lines.append(line[:cut])
+                    line = line[cut:]
+            lines.append(line)
+        return lines
+
+    def _font(self, size: int, bold: bool):
+        font = self._fonts.get((size, bold))
+        if font is None:
+            font = _load_font(size, bold)
+            self._fonts[(size, bold)] = font
+        return font
+
+    def _accent_color(self, design_style: str) -> str:
+        accent = self._accents.get(design_style)
+        if accent is None:
+            try:
+                accent = get_design_style(design_style)["colors"]["accent"].lstrip("#").upper()
+            except Exception:
+                accent = _FALLBACK_ACCENT
+            self._accents[design_style] = accent
+        return accent
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, cached=len(self._cache), cache_size=self.cache_size)
+
+
+def _load_font(size: int, bold: bool):
+    for filename in _FONT_FILES[bold]:
+        try:
+            return ImageFont.truetype(filename, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()  # Pillow < 10.1 has a single fixed-size bitmap font
+
+
+def _font_height(font) -> int:
+    left, top, right, bottom = font.getbbox("Ag")
+    return bottom
+
+
+def _rgb(hex_color: str) -> tuple:
+    return tuple(int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def _tint(rgb: tuple, amount: float) -> tuple:
+    """Blend rgb towards white"""
+    return tuple(round(channel + (255 - channel) * amount) for channel in rgb)
+
+
+# Global instance
+slide_preview = SlidePreviewRenderer()
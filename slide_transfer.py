@@ -0,0 +1,153 @@
+# slide_transfer.py
+# Move rendered slides between packages as plain data (slide XML plus the parts it relates to)
+
+import io
+import re
+from typing import Dict, List
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.package import PartFactory, XmlPart
+from pptx.oxml import parse_xml
+from lxml import etree
+
+_R_NAMESPACE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PARTNAME_NUMBER = re.compile(r"\d+(?=\.\w+$)")
+
+# Relationships a slide keeps when its content is swapped
+_STRUCTURAL_RELTYPES = (RT.SLIDE_LAYOUT, RT.NOTES_SLIDE)
+
+
+def export_slide(prs, slide) -> Dict:
+    """
+    Serialize slide (a slide of prs) to a picklable payload
+
+    The payload holds the layout index, the slide XML and the slide's
+    relationships with the related parts' content inlined, so it can be sent
+    to another process or imported into a different package.
+    """
+    return {
+        "layout": prs.slide_layouts.index(slide.slide_layout),
+        "xml": etree.tostring(slide._element),
+        "rels": _serialize_rels(slide.part)
+    }
+
+
+def append_slide(prs, payload: Dict):
+    """Add an exported slide to the end of prs and return it"""
+    slide = prs.slides.add_slide(prs.slide_layouts[payload["layout"]])
+    _swap_content(slide, payload)
+    return slide
+
+
+def replace_slide(prs, slide, payload: Dict):
+    """
+    Replace the content of slide (a slide of prs) with an exported slide
+
+    The slide keeps its part, partname and slide id, so its position in the deck
+    and any links to it are unchanged. Relationships the new content no longer
+    uses are dropped, which leaves the old slide's media and charts unreferenced
+    and out of the next save.
+    """
+    part = slide.part
+    layout = prs.slide_layouts[payload["layout"]]
+    if slide.slide_layout is not layout:
+        for rel in list(part.rels):
+            if rel.reltype == RT.SLIDE_LAYOUT:
+                part.rels.pop(rel.rId)
+        part.relate_to(layout.part, RT.SLIDE_LAYOUT)
+
+    _swap_content(slide, payload)
+
+    referenced = _referenced_rids(slide._element)
+    for rel in list(part.rels):
+        if rel.reltype not in _STRUCTURAL_RELTYPES and rel.rId not in referenced:
+            part.rels.pop(rel.rId)
+    return slide
+
+
+def _swap_content(slide, payload: Dict):
+    """Relate the payload's parts to slide and swap its XML in"""
+    rid_map = _relate_all(slide.part, payload["rels"])
+
+    rendered = parse_xml(payload["xml"])
+    _rewrite_rids(rendered, rid_map)
+
+    # The slide keeps its own <p:sld> element; only the children are replaced
+    element = slide._element
+    for child in list(element):
+        element.remove(child)
+    for child in list(rendered):
+        element.append(child)
+
+
+def _serialize_rels(part) -> List[Dict]:
+    """Relationships of part as plain data, with the related parts' content inlined"""
+    rels = []
+    for rel in part.rels:
+        rId = rel.rId
+        if rel.is_external:
+            rels.append({"rId": rId, "reltype": rel.reltype, "target_ref": rel.target_ref})
+        elif rel.reltype in _STRUCTURAL_RELTYPES:
+            continue  # layouts already exist in the target deck; notes are not generated
+        elif rel.reltype == RT.IMAGE:
+            rels.append({"rId": rId, "reltype": rel.reltype, "image": rel.target_part.blob})
+        else:
+            target = rel.target_part
+            rels.append({
+                "rId": rId,
+                "reltype": rel.reltype,
+                "part": {
+                    "partname": str(target.partname),
+                    "content_type": target.content_type,
+                    "blob": target.blob,
+                    "rels": _serialize_rels(target)
+                }
+            })
+    return rels
+
+
+def _relate_all(part, rels: List[Dict]) -> Dict[str, str]:
+    """Recreate serialized relationships on part and return the old -> new rId map"""
+    rid_map = {}
+    package = part.package
+    for rel in rels:
+        if "target_ref" in rel:
+            new_rId = part.relate_to(rel["target_ref"], rel["reltype"], is_external=True)
+        elif "image" in rel:
+            # Package-level SHA1 lookup - an image used on several slides is stored once
+            image_part = package.get_or_add_image_part(io.BytesIO(rel["image"]))
+            new_rId = part.relate_to(image_part, rel["reltype"])
+        else:
+            new_rId = part.relate_to(_add_part(package, rel["part"]), rel["reltype"])
+        rid_map[rel["rId"]] = new_rId
+    return rid_map
+
+
+def _add_part(package, data: Dict):
+    """Add a copy of a serialized part (and the parts it relates to) to package"""
+    partname = package.next_partname(_PARTNAME_NUMBER.sub("%d", data["partname"]))
+    part = PartFactory(partname, data["content_type"], package, data["blob"])
+    rid_map = _relate_all(part, data["rels"])
+    if isinstance(part, XmlPart):
+        _rewrite_rids(part._element, rid_map)
+    return part
+
+
+def _rewrite_rids(element, rid_map: Dict[str, str]):
+    """Point every r:* attribute in element at the rIds in rid_map"""
+    if not rid_map or all(old == new for old, new in rid_map.items()):
+        return
+    for node in element.iter():
+        for name, value in node.attrib.items():
+            if name.startswith("{%s}" % _R_NAMESPACE) and value in rid_map:
+                node.set(name, rid_map[value])
+
+
+def _referenced_rids(element) -> set:
+    """Every rId an r:* attribute in element points at"""
+    prefix = "{%s}" % _R_NAMESPACE
+    return {
+        value
+        for node in element.iter()
+        for name, value in node.attrib.items()
+        if name.startswith(prefix)
+    }
@@ -0,0 +1,245 @@
+# slide_writer.py
+# Fast-path writer: builds the title/bullet text boxes as DrawingML straight from a SlideRecord
+
+import re
+from lxml import etree
+from pptx.oxml.ns import qn
+from pptx.util import Inches
+from beautiful_simple_system import beautiful_system
+from design_styles import get_design_style
+from theme_engine import hex_to_rgb
+from slide_model import SlideRecord
+
+MAX_BULLETS = 4  # Matches BeautifulSimpleSystem._create_beautiful_content_slide
+MAX_BULLET_LENGTH = 80
+
+# Colors BeautifulSimpleSystem falls back to when a style has none
+FALLBACK_TITLE_COLOR = "1F3864"
+FALLBACK_BODY_COLOR = "44546A"
+FALLBACK_BACKGROUND_COLOR = "FFFFFF"
+
+# Default paragraph color added by design_enforcer.enforce_text_contrast
+CONTRAST_COLOR = "1E1E1E"
+
+_LINE_BREAK = re.compile("\n|\v")
+_CONTROL_CHARS = re.compile(r"([\x00-\x08\x0B-\x1F])")
+
+# Attribute order of <a:bodyPr> depends on the order BeautifulSimpleSystem sets the properties
+_BODY_ATTRS_MARGINS_FIRST = (("wrap", "square"), ("lIns", "0"), ("rIns", "0"), ("tIns", "0"), ("bIns", "0"), ("anchor", "t"))
+_BODY_ATTRS_ANCHOR_FIRST = (("wrap", "square"), ("anchor", "t"), ("lIns", "0"), ("rIns", "0"), ("tIns", "0"), ("bIns", "0"))
+
+
+class DirectSlideWriter:
+    """
+    Write a slide's background, title and bullets without python-pptx proxies
+
+    The XML is exactly what BeautifulSimpleSystem.create_beautiful_slide followed
+    by _apply_perfect_background and enforce_design produce, but each run is
+    built with a handful of lxml calls instead of add_paragraph and per-run font
+    property setters.
+    """
+
+    def __init__(self):
+        self._colors = {}
+        self.stats = {"written": 0, "fallbacks": 0}
+
+    def write(self, slide, record: SlideRecord, slide_index: int, design_style: str) -> bool:
+        """
+        Replace the slide background and shapes with the text layout for record
+
+        Returns False (leaving the slide untouched) for content the python-pptx
+        path handles differently, such as a title whose first line is empty.
+        """
+        if not self._can_write(record, slide_index):
+            self.stats["fallbacks"] += 1
+            return False
+
+        colors = self.get_colors(design_style)
+
+        c_sld = slide._element.find(qn("p:cSld"))
+        old_bg = c_sld.find(qn("p:bg"))
+        if old_bg is not None:
+            c_sld.remove(old_bg)
+        c_sld.insert(0, _background(colors["background"]))
+
+        sp_tree = c_sld.find(qn("p:spTree"))
+        for shape in list(sp_tree)[2:]:  # keep nvGrpSpPr and grpSpPr
+            sp_tree.remove(shape)
+
+        if slide_index == 0:
+            self._write_title_slide(sp_tree, record, colors)
+        else:
+            self._write_content_slide(sp_tree, record, colors)
+
+        beautiful_system.current_design_style = design_style
+        self.stats["written"] += 1
+        return True
+
+    def _can_write(self, record: SlideRecord, slide_index: int) -> bool:
+        """Frame text must be a str whose paragraphs each start with text rather than a line break"""
+        if record.title is not None and not _is_plain_frame_text(record.title):
+            return False
+        if slide_index == 0 and record.bullets:
+            return _is_plain_frame_text(record.bullets[0])
+        return True
+
+    def get_colors(self, design_style: str) -> dict:
+        """Title, body and background colors (hex) of a design style, cached per style"""
+        colors = self._colors.get(design_style)
+        if colors is None:
+            style_config = get_design_style(design_style)
+            colors = {
+                "title": _style_color(lambda: style_config["colors"]["title"], FALLBACK_TITLE_COLOR),
+                "body": _style_color(lambda: style_config["colors"]["body"], FALLBACK_BODY_COLOR),
+                "background": _style_color(lambda: style_config["background"]["colors"][0], FALLBACK_BACKGROUND_COLOR)
+            }
+            self._colors[design_style] = colors
+        return colors
+
+    def _write_title_slide(self, sp_tree, record: SlideRecord, colors: dict):
+        system = beautiful_system
+        title_left = system.beautiful_margin
+        title_top = system.slide_height * 0.35
+        title_width = system.content_width
+        title_height = Inches(1.5)
+
+        tx_body = _textbox(sp_tree, 2, title_left, title_top, title_width, title_height, _BODY_ATTRS_MARGINS_FIRST)
+        title = record.title if record.title is not None else "Presentation Title"
+        _frame_text(tx_body, title, "ctr", 110000, None, ("4800", "0", colors["title"], "Calibri Light"))
+
+        if record.bullets:
+            subtitle_top = title_top + title_height + Inches(0.3)
+            tx_body = _textbox(sp_tree, 3, title_left, subtitle_top, title_width, Inches(0.8), _BODY_ATTRS_MARGINS_FIRST)
+            _frame_text(tx_body, record.bullets[0], "ctr", None, None, ("2400", "0", colors["body"], "Calibri"))
+
+    def _write_content_slide(self, sp_tree, record: SlideRecord, colors: dict):
+        system = beautiful_system
+        title_left = system.beautiful_margin
+        title_top = system.beautiful_margin
+        title_width = system.content_width * 0.55
+        title_height = Inches(0.8)
+
+        tx_body = _textbox(sp_tree, 2, title_left, title_top, title_width, title_height, _BODY_ATTRS_MARGINS_FIRST)
+        title = record.title if record.title is not None else "Slide Title"
+        _frame_text(tx_body, title, "l", None, None, ("2800", "1", colors["title"], "Calibri"))
+
+        content_top = title_top + title_height + Inches(0.4)
+        content_height = system.slide_height - content_top - system.beautiful_margin
+        tx_body = _textbox(sp_tree, 3, title_left, content_top, title_width, content_height, _BODY_ATTRS_ANCHOR_FIRST)
+
+        bullets = record.bullets[:MAX_BULLETS]
+        if not bullets:
+            _add_paragraph(tx_body, "", None, None, None, None)
+            return
+
+        bullet_font = ("2000", "0", colors["body"], "Calibri")
+        for bullet in bullets:
+            bullet_text = str(bullet).strip()
+            if not bullet_text.startswith('•'):
+                bullet_text = f"• {bullet_text}"
+            if len(bullet_text) > MAX_BULLET_LENGTH:
+                bullet_text = bullet_text[:MAX_BULLET_LENGTH - 3] + "..."
+            _add_paragraph(tx_body, bullet_text, None, 140000, 1600, bullet_font)
+
+    def get_stats(self) -> dict:
+        return dict(self.stats)
+
+
+def _style_color(lookup, fallback: str) -> str:
+    try:
+        return str(hex_to_rgb(lookup()))
+    except Exception:
+        return fallback
+
+
+def _is_plain_frame_text(text) -> bool:
+    """
+    The python-pptx layout styles runs[0] of the first paragraph, so it must have
+    a run, and enforce_design puts <a:pPr> after a leading <a:br> rather than first
+    """
+    if not isinstance(text, str):
+        return False
+    paragraphs = text.split("\n")
+    return bool(paragraphs[0]) and not any(paragraph.startswith("\v") for paragraph in paragraphs)
+
+
+def _sub(parent, tag: str, attrs=()):
+    return etree.SubElement(parent, qn(tag), dict(attrs))
+
+
+def _solid_fill(parent, color: str):
+    fill = _sub(parent, "a:solidFill")
+    _sub(fill, "a:srgbClr", (("val", color),))
+
+
+def _background(color: str):
+    bg = etree.Element(qn("p:bg"))
+    bg_pr = _sub(bg, "p:bgPr")
+    _solid_fill(bg_pr, color)
+    _sub(bg_pr, "a:effectLst")
+    return bg
+
+
+def _textbox(sp_tree, shape_id: int, left, top, width, height, body_attrs):
+    """Append a text box shape the way SlideShapes.add_textbox builds it and return its txBody"""
+    sp = _sub(sp_tree, "p:sp")
+    nv_sp_pr = _sub(sp, "p:nvSpPr")
+    _sub(nv_sp_pr, "p:cNvPr", (("id", str(shape_id)), ("name", f"TextBox {shape_id - 1}")))
+    _sub(nv_sp_pr, "p:cNvSpPr", (("txBox", "1"),))
+    _sub(nv_sp_pr, "p:nvPr")
+
+    sp_pr = _sub(sp, "p:spPr")
+    xfrm = _sub(sp_pr, "a:xfrm")
+    _sub(xfrm, "a:off", (("x", "%d" % left), ("y", "%d" % top)))
+    _sub(xfrm, "a:ext", (("cx", "%d" % width), ("cy", "%d" % height)))
+    prst_geom = _sub(sp_pr, "a:prstGeom", (("prst", "rect"),))
+    _sub(prst_geom, "a:avLst")
+    _sub(sp_pr, "a:noFill")
+
+    tx_body = _sub(sp, "p:txBody")
+    body_pr = _sub(tx_body, "a:bodyPr", body_attrs)
+    _sub(body_pr, "a:spAutoFit")
+    _sub(tx_body, "a:lstStyle")
+    return tx_body
+
+
+def _frame_text(tx_body, text: str, align, line_spacing, space_after, font):
+    """TextFrame.text: one paragraph per line, with only the first one formatted"""
+    lines = text.split("\n")
+    _add_paragraph(tx_body, lines[0], align, line_spacing, space_after, font)
+    for line in lines[1:]:
+        _add_paragraph(tx_body, line, None, None, None, None)
+
+
+def _add_paragraph(tx_body, text: str, align, line_spacing, space_after, font):
+    """
+    Append an <a:p> as _Paragraph.text plus the layout's formatting would leave it
+
+    font is (size, bold, color, typeface) for the paragraph's first run, or None.
+    """
+    p = _sub(tx_body, "a:p")
+    p_pr = _sub(p, "a:pPr", (("algn", align),) if align else ())
+    if line_spacing is not None:
+        _sub(_sub(p_pr, "a:lnSpc"), "a:spcPct", (("val", str(line_spacing)),))
+    if space_after is not None:
+        _sub(_sub(p_pr, "a:spcAft"), "a:spcPts", (("val", str(space_after)),))
+    _solid_fill(_sub(p_pr, "a:defRPr"), CONTRAST_COLOR)
+
+    first_run = True
+    for index, run_text in enumerate(_LINE_BREAK.split(text)):
+        if index > 0:
+            _sub(p, "a:br")
+        if not run_text:
+            continue
+        r = _sub(p, "a:r")
+        if first_run and font is not None:
+            size, bold, color, typeface = font
+            r_pr = _sub(r, "a:rPr", (("sz", size), ("b", bold)))
+            _solid_fill(r_pr, color)
+            _sub(r_pr, "a:latin", (("typeface", typeface),))
+        first_run = False
+        _sub(r, "a:t").text = _CONTROL_CHARS.sub(lambda match: "_x%04X_" % ord(match.group(1)), run_text)
+
+
+# Global instance
+slide_writer = DirectSlideWriter()
@@ -0,0 +1,166 @@
+# streaming_writer.py
+# Deck writer that streams each finished slide and its media into the .pptx zip
+
+import hashlib
+import re
+import time
+from typing import Dict
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.oxml import CT_Relationships, serialize_part_xml
+from pptx.opc.package import Part
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI, PackURI
+from pptx.opc.serialized import _ContentTypesItem
+from package_writer import package_writer
+
+_PARTNAME_NUMBER = re.compile(r"\d+(?=\.\w+$)")
+
+
+class StreamingDeckWriter:
+    """
+    Write a deck slide by slide instead of holding every slide until save
+
+    prs is the base presentation (the template with no slides) and stays in
+    memory. Each finished slide is serialized straight into the zip along with
+    the images, charts and embeddings it relates to, then dropped from the
+    scratch presentation it was rendered in, so memory does not grow with the
+    slide count. Images are stored once per deck (SHA1). close() adds the
+    slides to presentation.xml and writes the template parts and
+    [Content_Types].xml last.
+    """
+
+    def __init__(self, prs, output):
+        self.prs = prs
+        self._zip_file = package_writer.open_zip(output)
+        self._closed = False
+        self._used_partnames = {str(part.partname) for part in prs.part.package.iter_parts()}
+        self._next_numbers = {}
+        self._written_parts = []  # _WrittenPart per streamed member, for [Content_Types].xml
+        self._images = {}  # SHA1 -> partname
+        self._start_time = time.time()
+        self.stats = {"slides": 0, "parts": 0, "images_reused": 0, "stored_bytes": 0, "deflated_bytes": 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.abort()
+
+    def write_slide(self, scratch_prs, slide):
+        """Stream slide (rendered in scratch_prs) to the zip and remove it from scratch_prs"""
+        part = slide.part
+        partname = self._next_partname("/ppt/slides/slide%d.xml")
+        stub = self._stream(partname, part.content_type, part.blob)
+        self._write_rels(partname, part)
+
+        # The base deck only keeps the stub, so presentation.xml lists the slide
+        rId = self.prs.part.relate_to(stub, RT.SLIDE)
+        self.prs.slides._sldIdLst.add_sldId(rId)
+
+        _remove_slide(scratch_prs, slide)
+        self.stats["slides"] += 1
+
+    def close(self):
+        """Write presentation.xml, the template parts and [Content_Types].xml, and finish the zip"""
+        package = self.prs.part.package
+        parts = [part for part in package.iter_parts() if not isinstance(part, _WrittenPart)]
+
+        for part in parts:
+            self._write(str(part.partname), part.content_type, part.blob)
+            if part._rels:
+                self._zip_file.writestr(part.partname.rels_uri.membername, part.rels.xml)
+
+        self._zip_file.writestr(PACKAGE_URI.rels_uri.membername, package._rels.xml)
+        content_types = _ContentTypesItem.xml_for(parts + self._written_parts)
+        self._zip_file.writestr(CONTENT_TYPES_URI.lstrip("/"), serialize_part_xml(content_types))
+        self._zip_file.close()
+        self._closed = True
+
+        elapsed = time.time() - self._start_time
+        package_writer.record_save(self.stats["stored_bytes"], self.stats["deflated_bytes"], elapsed)
+        print(f"[STREAM] Wrote {self.stats['slides']} slides ({self.stats['parts']} parts, "
+              f"{self.stats['images_reused']} reused images) in {elapsed:.2f}s")
+
+    def abort(self):
+        """Close the zip of a deck that did not finish (no-op after close)"""
+        if not self._closed:
+            self._zip_file.close()
+            self._closed = True
+
+    def get_stats(self) -> Dict:
+        return dict(self.stats)
+
+    def _write_rels(self, partname: str, part):
+        """Write part's .rels, streaming every part it relates to first (rIds are kept as they are)"""
+        rels = CT_Relationships.new()
+        base_uri = PackURI(partname).baseURI
+        for rel in part.rels:
+            if rel.is_external:
+                rels.add_rel(rel.rId, rel.reltype, rel.target_ref, is_external=True)
+            elif rel.reltype == RT.NOTES_SLIDE:
+                continue  # notes are not generated
+            else:
+                target_partname = self._write_related(rel.target_part, rel.reltype)
+                rels.add_rel(rel.rId, rel.reltype, PackURI(target_partname).relative_ref(base_uri))
+        if len(rels):
+            self._zip_file.writestr(PackURI(partname).rels_uri.membername, rels.xml)
+
+    def _write_related(self, target, reltype: str) -> str:
+        """Stream a part a slide relates to and return its partname in the output deck"""
+        if reltype == RT.SLIDE_LAYOUT:
+            # Scratch decks are copies of the same template, so layouts have the same partnames
+            return str(target.partname)
+
+        blob = target.blob
+        if reltype == RT.IMAGE:
+            sha1 = hashlib.sha1(blob).hexdigest()
+            if sha1 in self._images:
+                self.stats["images_reused"] += 1
+                return self._images[sha1]
+            partname = self._next_partname(f"/ppt/media/image%d.{target.partname.ext}")
+            self._images[sha1] = partname
+            self._stream(partname, target.content_type, blob)
+            return partname
+
+        partname = self._next_partname(_PARTNAME_NUMBER.sub("%d", str(target.partname)))
+        self._stream(partname, target.content_type, blob)
+        self._write_rels(partname, target)
+        return partname
+
+    def _stream(self, partname: str, content_type: str, blob: bytes):
+        """Write a slide-level part now and return the stub that stands in for it"""
+        self._write(partname, content_type, blob)
+        stub = _WrittenPart(PackURI(partname), content_type, self.prs.part.package)
+        self._written_parts.append(stub)
+        self.stats["parts"] += 1
+        return stub
+
+    def _write(self, partname: str, content_type: str, blob: bytes):
+        if package_writer.write_member(self._zip_file, partname.lstrip("/"), blob, content_type):
+            self.stats["stored_bytes"] += len(blob)
+        else:
+            self.stats["deflated_bytes"] += len(blob)
+
+    def _next_partname(self, tmpl: str) -> str:
+        """First unused partname for tmpl, continuing from the last number handed out"""
+        number = self._next_numbers.get(tmpl, 1)
+        while tmpl % number in self._used_partnames:
+            number += 1
+        self._next_numbers[tmpl] = number + 1
+        partname = tmpl % number
+        self._used_partnames.add(partname)
+        return partname
+
+
+class _WrittenPart(Part):
+    """Placeholder for a part already in the zip - keeps only its partname and content type"""
+
+
+def _remove_slide(prs, slide):
+    """Drop slide from prs so its part, XML and media can be freed"""
+    sld_id_lst = prs.slides._sldIdLst
+    for rel in list(prs.part.rels):
+        if not rel.is_external and rel.target_part is slide.part:
+            for sld_id in list(sld_id_lst):
+                if sld_id.rId == rel.rId:
+                    sld_id_lst.remove(sld_id)
+            prs.part.drop_rel(rel.rId)
@@ -0,0 +1,96 @@
+# test_image_prefetch.py
+# Prefetched slide images: per-fetch deadlines on the shared prefetch pool
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from image_api_service import ImageAPIService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """Image service with a single prefetch thread; fetch_for_slide sleeps for slide['delay']"""
+    service = ImageAPIService()
+    service._executor = ThreadPoolExecutor(max_workers=1)
+    started = []
+
+    def fetch_for_slide(slide_content, box=None):
+        started.append(slide_content["title"])
+        time.sleep(slide_content.get("delay", 0))
+        return slide_content["title"].encode("utf-8")
+
+    monkeypatch.setattr(service, "fetch_for_slide", fetch_for_slide)
+    service.started = started
+    yield service
+    service._executor.shutdown(wait=True)
+
+
+def test_each_slide_gets_its_own_image(service):
+    images = service.prefetch({1: {"title": "one"}, 3: {"title": "three"}}, deadline=5)
+
+    assert images[3].result() == b"three"
+    assert images[1].result() == b"one"
+
+
+def test_slow_fetch_misses_its_deadline(service):
+    images = service.prefetch({1: {"title": "slow", "delay": 1.0}}, deadline=0.2)
+
+    start = time.time()
+    assert images[1].result() is None
+    assert time.time() - start < 0.8
+
+
+def test_queued_fetch_is_not_timed_out_by_another_decks_work(service):
+    other_deck = service.prefetch({1: {"title": "busy", "delay": 0.6}}, deadline=5)
+    while not service.started:
+        time.sleep(0.01)
+    images = service.prefetch({1: {"title": "queued"}}, deadline=0.2)
+
+    # The only prefetch thread is busy for longer than the deadline
+    time.sleep(0.3)
+    assert images[1].result() == b"queued"
+    assert other_deck[1].result() == b"busy"
+
+
+def test_deadline_starts_when_the_fetch_starts(service):
+    other_deck = service.prefetch({1: {"title": "busy", "delay": 0.4}}, deadline=5)
+    images = service.prefetch({1: {"title": "later", "delay": 0.3}}, deadline=0.5)
+
+    # Ask once the fetch has left the queue - 0.7 s after it was submitted
+    while "later" not in service.started:
+        time.sleep(0.01)
+    assert images[1].result() == b"later"
+    assert other_deck[1].result() == b"busy"
+
+
+def test_streamed_deck_keeps_a_window_of_images_in_flight(monkeypatch):
+    import ppt_generator
+    from image_api_service import image_api
+
+    monkeypatch.setattr(image_api, "prefetch", lambda slides, box=None: {index: f"image {index}" for index in slides})
+    image_slides = {index: {"title": f"Slide {index}"} for index in range(1, 11)}
+    visuals = {}
+
+    ppt_generator._prefetch_images(image_slides, visuals, window=3)
+    assert sorted(visuals) == [1, 2, 3]
+
+    # Slide 1 is written, so one more image starts
+    visuals.pop(1)
+    ppt_generator._prefetch_images(image_slides, visuals, window=3)
+    assert sorted(visuals) == [2, 3, 4]
+    assert list(image_slides) == [5, 6, 7, 8, 9, 10]
+
+
+def test_in_memory_deck_fetches_every_image_at_once(monkeypatch):
+    import ppt_generator
+    from image_api_service import image_api
+
+    monkeypatch.setattr(image_api, "prefetch", lambda slides, box=None: {index: f"image {index}" for index in slides})
+    image_slides = {index: {"title": f"Slide {index}"} for index in range(1, 11)}
+    visuals = {}
+
+    ppt_generator._prefetch_images(image_slides, visuals)
+    assert sorted(visuals) == list(range(1, 11))
+    assert not image_slides
@@ -0,0 +1,45 @@
+# test_large_deck.py
+# Decks over STREAMING_WRITER_MIN_SLIDES are reachable through the API and stream with default flags
+
+from pptx import Presentation
+
+import ppt_generator
+from config import MAX_DECK_SLIDES, STREAMING_WRITER_MIN_SLIDES
+from image_api_service import image_api
+from presentation_service import presentation_service
+from user_manager import user_manager
+
+
+def _request(slide_count):
+    return {'task': 'Solar energy', 'url': 'https://example.com/solar', 'slide_count': slide_count}
+
+
+def test_enterprise_plan_allows_streamed_deck_sizes():
+    user_manager.update_plan('enterprise_user', 'enterprise')
+
+    assert presentation_service.validate_generation_request('enterprise_user', _request(STREAMING_WRITER_MIN_SLIDES))['valid']
+    assert presentation_service.validate_generation_request('enterprise_user', _request(MAX_DECK_SLIDES))['valid']
+    assert not presentation_service.validate_generation_request('enterprise_user', _request(MAX_DECK_SLIDES + 1))['valid']
+
+
+def test_large_deck_is_streamed_with_default_flags(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_api, 'fetch_for_slide', lambda slide_content, box=None: None)
+    streamed = []
+    writer_class = ppt_generator.StreamingDeckWriter
+
+    def streaming_writer(prs, output_path):
+        streamed.append(output_path)
+        return writer_class(prs, output_path)
+
+    monkeypatch.setattr(ppt_generator, 'StreamingDeckWriter', streaming_writer)
+
+    slide_count = STREAMING_WRITER_MIN_SLIDES + 5
+    slides = [{'slide_type': 'title', 'title': 'Solar energy', 'bullets': ['Overview']}]
+    slides += [{'slide_type': 'content', 'title': f'Topic {i}', 'bullets': ['Adoption grew 20%', 'Costs fell 30%']}
+               for i in range(1, slide_count)]
+    output_path = str(tmp_path / 'large.pptx')
+
+    ppt_generator.generate_ppt(slides, output_path, 'minimal_1', {'graphs': True, 'tables': True, 'images': True})
+
+    assert streamed == [output_path]
+    assert len(Presentation(output_path).slides) == slide_count
@@ -0,0 +1,162 @@
+# test_llm_failover.py
+# Replica failover, retry and exhaustion in LLMBackend._post against local stub servers
+
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import llm_backends
+from llm_backends import OllamaBackend
+
+
+class StubReplica:
+    """Local HTTP server answering /api/generate with a fixed status, optionally after a delay"""
+
+    def __init__(self, status: int = 200, delay: float = 0.0, text: str = "ok"):
+        self.status = status
+        self.delay = delay
+        self.text = text
+        self.hits = 0
+
+        replica = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                replica.hits += 1
+                if replica.delay:
+                    time.sleep(replica.delay)
+                body = json.dumps({"response": replica.text}).encode("utf-8")
+                try:
+                    self.send_response(replica.status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except OSError:
+                    pass  # the client timed out and went away
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}/api/generate"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _closed_url() -> str:
+    """URL of a local port nothing listens on"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/api/generate"
+
+
+@pytest.fixture
+def replicas():
+    started = []
+
+    def start(**kwargs):
+        replica = StubReplica(**kwargs)
+        started.append(replica)
+        return replica
+
+    yield start
+    for replica in started:
+        replica.close()
+
+
+def _stats(backend):
+    return {stats["url"]: stats for stats in backend.get_replica_stats()}
+
+
+def test_server_error_fails_over_to_next_replica(replicas):
+    failing = replicas(status=503)
+    healthy = replicas(text="from healthy")
+    backend = OllamaBackend(urls=[failing.url, healthy.url])
+
+    assert backend.generate("prompt", timeout=5) == "from healthy"
+    assert failing.hits == 1 and healthy.hits == 1
+    stats = _stats(backend)
+    assert stats[failing.url]["errors"] == 1
+    assert stats[healthy.url]["errors"] == 0
+
+
+def test_connection_error_fails_over_to_next_replica(replicas):
+    healthy = replicas(text="from healthy")
+    down = _closed_url()
+    backend = OllamaBackend(urls=[down, healthy.url])
+
+    assert backend.generate("prompt", timeout=5) == "from healthy"
+    assert _stats(backend)[down]["errors"] == 1
+
+
+def test_timeout_is_retried_on_another_replica(replicas):
+    slow = replicas(delay=2.0)
+    healthy = replicas(text="from healthy")
+    backend = OllamaBackend(urls=[slow.url, healthy.url])
+
+    start = time.time()
+    assert backend.generate("prompt", timeout=0.5) == "from healthy"
+    assert time.time() - start < 2.0
+    assert _stats(backend)[slow.url]["errors"] == 1
+
+
+def test_client_error_is_not_retried(replicas):
+    rejecting = replicas(status=400)
+    healthy = replicas()
+    backend = OllamaBackend(urls=[rejecting.url, healthy.url])
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        backend.generate("prompt", timeout=5)
+    assert healthy.hits == 0
+    assert _stats(backend)[rejecting.url]["errors"] == 0
+
+
+def test_exhaustion_raises_last_error_after_max_attempts(replicas, monkeypatch):
+    monkeypatch.setattr(llm_backends, "LLM_MAX_ATTEMPTS", 2)
+    failing = [replicas(status=500) for _ in range(3)]
+    backend = OllamaBackend(urls=[replica.url for replica in failing])
+
+    with pytest.raises(requests.exceptions.HTTPError) as error:
+        backend.generate("prompt", timeout=5)
+    assert error.value.response.status_code == 500
+    assert sum(replica.hits for replica in failing) == 2
+    assert all(stats["outstanding"] == 0 for stats in backend.get_replica_stats())
+
+
+def test_exhaustion_with_every_replica_down_raises_connection_error():
+    backend = OllamaBackend(urls=[_closed_url(), _closed_url()])
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        backend.generate("prompt", timeout=5)
+
+
+def test_failing_replica_is_ejected(replicas):
+    failing = replicas(status=503)
+    healthy = replicas(text="from healthy")
+    backend = OllamaBackend(urls=[failing.url, healthy.url])
+    backend.pool.eject_after = 2
+
+    for _ in range(2):
+        # Keep routing to the failing replica first while it is still healthy
+        backend.pool.replicas[1].outstanding += 1
+        try:
+            assert backend.generate("prompt", timeout=5) == "from healthy"
+        finally:
+            backend.pool.replicas[1].outstanding -= 1
+
+    assert not _stats(backend)[failing.url]["healthy"]
+    hits = failing.hits
+    assert backend.generate("prompt", timeout=5) == "from healthy"
+    assert failing.hits == hits
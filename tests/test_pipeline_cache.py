@@ -0,0 +1,76 @@
+# test_pipeline_cache.py
+# A deck the continuation rounds could not complete must not reach the prompt cache
+
+import json
+
+import pytest
+
+import pipeline
+from prompt_cache import SemanticPromptCache
+
+CONTENT = "Solar power adoption grew quickly across many regions in the last decade. " * 10
+
+
+def _slides_response(titles):
+    slides = [{"slide_type": "title", "title": "Solar energy", "bullets": ["Overview"]}]
+    slides += [{"slide_type": "content", "title": title, "bullets": ["One", "Two", "Three"]} for title in titles]
+    return json.dumps({"slides": slides})
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    cache = SemanticPromptCache()
+    monkeypatch.setattr(pipeline, "prompt_cache", cache)
+    monkeypatch.setattr(pipeline, "extract_main", lambda url: CONTENT)
+    monkeypatch.setattr(pipeline, "last_call_used_fallback", lambda: False)
+    monkeypatch.setattr(pipeline, "generate_ppt", _write_placeholder_deck)
+    monkeypatch.setattr(pipeline, "OUTPUT_DIR", str(tmp_path))
+    return cache
+
+
+def _write_placeholder_deck(slides, output_path, **kwargs):
+    with open(output_path, "wb") as f:
+        f.write(b"pptx")
+    return output_path
+
+
+def _llm(continuation):
+    """call_llm stand-in: a truncated first response, then continuation() for every follow-up"""
+    calls = []
+
+    def call_llm(prompt, **kwargs):
+        calls.append(prompt)
+        if len(calls) == 1:
+            return _slides_response(["Growth", "Costs"])
+        return continuation()
+
+    return call_llm
+
+
+def _run(cache):
+    pipeline.run_pipeline("https://example.com/solar", "Solar energy", "minimal_1", {}, slide_count=6, plan="pro")
+    return cache.get_stats()["stores"]
+
+
+def test_unavailable_llm_during_continuation_is_not_cached(cache, monkeypatch):
+    def unavailable():
+        raise RuntimeError("LLM unavailable (circuit open)")
+
+    monkeypatch.setattr(pipeline, "call_llm", _llm(unavailable))
+    assert _run(cache) == 0
+
+
+def test_unparseable_continuation_is_not_cached(cache, monkeypatch):
+    monkeypatch.setattr(pipeline, "call_llm", _llm(lambda: "not json at all"))
+    assert _run(cache) == 0
+
+
+def test_deck_still_short_after_continuation_rounds_is_not_cached(cache, monkeypatch):
+    rounds = iter(range(100))
+    monkeypatch.setattr(pipeline, "call_llm", _llm(lambda: _slides_response([f"Extra {next(rounds)}"])))
+    assert _run(cache) == 0
+
+
+def test_complete_deck_is_cached(cache, monkeypatch):
+    monkeypatch.setattr(pipeline, "call_llm", _llm(lambda: _slides_response(["Policy", "Storage", "Outlook"])))
+    assert _run(cache) == 1
@@ -0,0 +1,63 @@
+# test_slide_writer.py
+# The direct lxml slide writer must produce the same slide XML as the python-pptx path
+
+import pytest
+from lxml import etree
+
+from beautiful_simple_system import beautiful_system
+from config import AVAILABLE_DESIGN_STYLES
+from design_enforcer import enforce_design
+from design_styles import get_design_style
+from ppt_generator import SLIDE_LAYOUTS, _apply_perfect_background
+from presentation_pool import presentation_pool
+from slide_mapper import get_slide_layout
+from slide_model import SlideRecord
+from slide_writer import slide_writer
+
+SLIDES = [
+    {"slide_type": "content", "title": "Hello", "bullets": ["a", "b", "c", "d", "e"]},
+    {"slide_type": "content", "title": "Two\nlines", "bullets": ["x\vy", "p\nq", "•already", " spaced ", "z" * 120]},
+    {"slide_type": "content", "title": "T", "bullets": []},
+    {"slide_type": "content", "bullets": [1, None, 3.5]},
+    {"slide_type": "summary", "title": "ctrl\x07char\ttab", "bullets": ["bell\x1b"]},
+    {"slide_type": "content", "title": "a\n\nb\n", "bullets": ["•\nfoo"]},
+    {"slide_type": "title", "title": "Deck", "bullets": ["Sub"]},
+    {"slide_type": "title", "title": "Deck\nTwo", "bullets": ["Sub\vx\ny"]},
+    {"slide_type": "title", "title": "Only", "bullets": []},
+]
+
+
+@pytest.fixture(scope="module")
+def prs():
+    return presentation_pool.new_presentation()
+
+
+def _python_pptx_xml(prs, slide_data, slide_index, design_style) -> bytes:
+    slide = prs.slides.add_slide(prs.slide_layouts[SLIDE_LAYOUTS[slide_data["slide_type"]]])
+    _apply_perfect_background(slide, get_design_style(design_style))
+    beautiful_system.create_beautiful_slide(slide, slide_data, slide_index, 5, design_style)
+    enforce_design(slide, get_slide_layout(slide_data["slide_type"]))
+    return etree.tostring(slide._element)
+
+
+def _direct_xml(prs, slide_data, slide_index, design_style) -> bytes:
+    slide = prs.slides.add_slide(prs.slide_layouts[SLIDE_LAYOUTS[slide_data["slide_type"]]])
+    assert slide_writer.write(slide, SlideRecord.from_dict(slide_data), slide_index, design_style)
+    return etree.tostring(slide._element)
+
+
+@pytest.mark.parametrize("design_style", AVAILABLE_DESIGN_STYLES)
+@pytest.mark.parametrize("slide_data", SLIDES, ids=lambda slide: f"{slide['slide_type']}-{slide.get('title', '')!r}")
+def test_direct_writer_matches_python_pptx(prs, slide_data, design_style):
+    slide_index = 0 if slide_data["slide_type"] == "title" else 1
+    assert _direct_xml(prs, slide_data, slide_index, design_style) == \
+        _python_pptx_xml(prs, slide_data, slide_index, design_style)
+
+
+def test_blank_first_title_line_falls_back(prs):
+    slide = prs.slides.add_slide(prs.slide_layouts[SLIDE_LAYOUTS["content"]])
+    record = SlideRecord.from_dict({"slide_type": "content", "title": "\vlead", "bullets": ["k"]})
+    shapes = len(slide.shapes)
+
+    assert not slide_writer.write(slide, record, 1, "minimal_1")
+    assert len(slide.shapes) == shapes
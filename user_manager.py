@@ -6,7 +6,7 @@ import uuid
 import time
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Tuple
-from config import SUBSCRIPTION_PLANS
+from config import SUBSCRIPTION_PLANS, MAX_DECK_SLIDES
 
 class UserManager:
     """Manages user data, subscriptions, and usage limits"""
@@ -212,7 +212,7 @@ class UserManager:
                 'name': 'Admin',
                 'daily_limit': 999999,  # Unlimited
                 'total_limit': None,    # No limit
-                'max_slides': 50,       # Admin max slides
+                'max_slides': MAX_DECK_SLIDES,  # Admin max slides
                 'has_ads': False,
                 'visual_elements': True,
                 'price': 0,
@@ -8,23 +8,33 @@ import io
 from PIL import Image
 from beautiful_simple_system import beautiful_system
 
-def add_visual_elements_to_slide(slide, slide_data, design_style, visual_prefs, prs, slide_index=0):
-    """Add beautiful, simple visual elements - MAXIMUM ONE per slide"""
+def add_visual_elements_to_slide(slide, slide_data, design_style, visual_prefs, prs, slide_index=0, text_ready=False):
+    """Add beautiful, simple visual elements - MAXIMUM ONE per slide
+    
+    text_ready=True means the title/bullet layout is already on the slide
+    (written directly by slide_writer) and only the visual needs adding.
+    """
     
     try:
-        total_slides = len(prs.slides) if hasattr(prs, 'slides') else getattr(prs, '_total_slides', 10)
+        total_slides = getattr(prs, "_total_slides", None) or len(prs.slides)
         
         # Use beautiful simple system - NO MORE MESSY MULTIPLE ELEMENTS
-        layout_type = beautiful_system.create_beautiful_slide(
-            slide, slide_data, slide_index, total_slides, design_style
-        )
+        if text_ready:
+            layout_type = 'title' if slide_index == 0 else 'content'
+        else:
+            layout_type = beautiful_system.create_beautiful_slide(
+                slide, slide_data, slide_index, total_slides, design_style
+            )
         
         # Only add ONE visual element if this is not a title slide
         if slide_index > 0 and layout_type != 'title':
             visual_added = False
             
-            # Professional visual distribution with slide context
-            if beautiful_system.add_single_beautiful_visual(slide, slide_data, design_style, {}, 'auto', slide_index, total_slides):
+            # Professional visual distribution with slide context (pre-rendered by the deck prepass when available);
+            # the entry is taken out of the deck's visuals so its image bytes are freed with the slide
+            prerendered = getattr(prs, "_visuals", {}).pop(slide_index, None)
+            if beautiful_system.add_single_beautiful_visual(slide, slide_data, design_style, {}, 'auto', slide_index, total_slides,
+                                                            prerendered):
                 visual_added = True
                 print(f"[BEAUTIFUL] ✓ Added professional visual to slide {slide_index + 1}")
             